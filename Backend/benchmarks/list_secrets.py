@@ -0,0 +1,99 @@
+"""Time GET /api/secrets on a large listing with each JSON encoder.
+
+    cd Backend/src && python ../benchmarks/list_secrets.py --rows 100000
+
+Rows are inserted directly into a throwaway SQLite database, the legacy
+handler (ORM objects, hand-built dicts, jsonify) is timed for comparison.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, UTC
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def build_app(database_uri: str, encoder: str):
+    os.environ['JOB_WORKERS'] = '0'
+    from config import Config
+    from core.factory import create_app
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        JSON_ENCODER = encoder
+        ADMISSION_CONTROL = False
+
+    return create_app(BenchmarkConfig)
+
+
+def seed(app, rows: int):
+    from models import Project, Secret, db
+
+    with app.app_context():
+        db.session.add(Project(id=1, project_name='benchmark'))
+        db.session.commit()
+        now = datetime.now(UTC)
+        # Core inserts skip the ORM events, counters and index are not needed here
+        for start in range(0, rows, 10000):
+            db.session.execute(Secret.__table__.insert(), [{
+                'description': f'Benchmark key {i}',
+                'created_by': f'user{i % 50}',
+                'created_at': now,
+                'project_id': 1,
+                'secret_type_id': 1
+            } for i in range(start, min(start + 10000, rows))])
+        db.session.commit()
+
+
+def legacy_list_secrets():
+    from flask import jsonify
+    from models import Secret
+
+    return jsonify([{
+        'id': s.id,
+        'description': s.description,
+        'created_by': s.created_by,
+        'created_at': s.created_at.isoformat(),
+        'project_id': s.project_id,
+        'secret_type_id': s.secret_type_id
+    } for s in Secret.query.all()])
+
+
+def best_of(repeat: int, run) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = run()
+        timings.append(time.perf_counter() - started)
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_uri = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        apps = {encoder: build_app(database_uri, encoder) for encoder in ('json', 'orjson')}
+        seed(apps['json'], args.rows)
+
+        def legacy():
+            with apps['json'].test_request_context('/api/secrets'):
+                return len(legacy_list_secrets().get_data())
+
+        results = {'legacy handler, json': best_of(args.repeat, legacy)}
+        for encoder, app in apps.items():
+            client = app.test_client()
+            results[f'streamed, {encoder}'] = best_of(args.repeat, lambda: len(client.get('/api/secrets').get_data()))
+
+        print(f'GET /api/secrets with {args.rows} rows, best of {args.repeat}')
+        for name, (seconds, size) in results.items():
+            print(f'  {name:<22} {seconds * 1000:8.0f} ms  {size / 1e6:6.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
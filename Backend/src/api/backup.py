@@ -0,0 +1,57 @@
+from flask import Blueprint, jsonify, request, url_for
+from http import HTTPStatus
+from decorators import log_operation
+from core.backup import list_snapshots, get_backup_dir
+from core.jobs import submit_job
+
+bp = Blueprint('backup', __name__)
+
+@bp.route('', methods=['POST'])
+@log_operation('create_backup')
+def create_backup():
+    """
+    Start an online backup of the database
+    ---
+    tags:
+      - admin
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required:
+            - created_by
+          properties:
+            created_by:
+              type: string
+              example: "Harris.Han"
+    responses:
+      202:
+        description: Backup job accepted, poll the job for copied pages
+      400:
+        description: Invalid request data
+    """
+    data = request.get_json(silent=True) or {}
+
+    if 'created_by' not in data:
+        return jsonify({'error': 'created_by is required'}), HTTPStatus.BAD_REQUEST
+
+    job = submit_job('backup_database', {}, data['created_by'])
+
+    return jsonify({
+        'job_id': job.id,
+        'job_url': url_for('job.get_job', job_id=job.id)
+    }), HTTPStatus.ACCEPTED
+
+@bp.route('', methods=['GET'])
+def list_backups():
+    """
+    List database snapshots, newest first
+    ---
+    tags:
+      - admin
+    responses:
+      200:
+        description: Snapshot manifests with size, checksums and duration
+    """
+    return jsonify(list_snapshots(get_backup_dir())), HTTPStatus.OK
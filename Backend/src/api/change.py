@@ -0,0 +1,74 @@
+import json
+from flask import Blueprint, jsonify, request, current_app
+from http import HTTPStatus
+from core.changes import get_changes, get_latest_seq, is_since_expired, prune_changes
+
+bp = Blueprint('change', __name__)
+
+MAX_LIMIT = 1000
+
+def serialize_change(change):
+    return {
+        'seq': change.seq,
+        'entity_type': change.entity_type,
+        'entity_id': change.entity_id,
+        'action': change.action,
+        'timestamp': change.timestamp.isoformat(),
+        'data': json.loads(change.data) if change.data else None
+    }
+
+def resync_required():
+    return jsonify({
+        'error': 'Changes since this sequence are no longer available, reload the full lists',
+        'last_seq': get_latest_seq()
+    }), HTTPStatus.GONE
+
+@bp.route('', methods=['GET'])
+def list_changes():
+    """
+    List changes after a sequence number
+    ---
+    tags:
+      - change
+    parameters:
+      - name: since
+        in: query
+        type: integer
+        required: false
+        default: 0
+        description: Last sequence number the client has seen, poll again with the returned last_seq
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 500
+    responses:
+      200:
+        description: Changes ordered by sequence number
+        schema:
+          properties:
+            changes:
+              type: array
+              items:
+                type: object
+            last_seq:
+              type: integer
+            has_more:
+              type: boolean
+      410:
+        description: The requested changes were pruned or rolled back by a restore, the client must reload the full lists
+    """
+    since = max(request.args.get('since', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 500, type=int), 1), MAX_LIMIT)
+
+    prune_changes(current_app.config['CHANGE_RETENTION_DAYS'])
+    if is_since_expired(since):
+        return resync_required()
+
+    # Requests return at once, an idle poll is two primary key lookups
+    changes = get_changes(since, limit)
+    return jsonify({
+        'changes': [serialize_change(c) for c in changes],
+        'last_seq': changes[-1].seq if changes else since,
+        'has_more': len(changes) == limit
+    }), HTTPStatus.OK
@@ -0,0 +1,185 @@
+import json
+import os
+from flask import Blueprint, jsonify, request, send_file, url_for
+from models import Job
+from http import HTTPStatus
+from decorators import log_operation, admission_control
+from core.jobs import submit_job, cancel_job, get_job_types, get_result_dir, TERMINAL_STATUSES
+
+bp = Blueprint('job', __name__)
+
+def serialize_job(job):
+    result = json.loads(job.result) if job.result else None
+    return {
+        'id': job.id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'params': json.loads(job.params) if job.params else {},
+        'created_by': job.created_by,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'progress': job.progress,
+        'total': job.total,
+        'attempts': job.attempts,
+        'cancel_requested': job.cancel_requested,
+        'result': result,
+        'result_url': url_for('job.download_job_result', job_id=job.id) if result and result.get('file') else None,
+        'error': job.error
+    }
+
+@bp.route('', methods=['POST'])
+@admission_control('bulk')
+@log_operation('create_job')
+def create_job():
+    """
+    Submit a background job
+    ---
+    tags:
+      - job
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required:
+            - job_type
+            - created_by
+          properties:
+            job_type:
+              type: string
+              enum: [generate_keys, rotate_keys, archive_project, export_operations]
+              example: "generate_keys"
+            created_by:
+              type: string
+              example: "Harris.Han"
+            params:
+              type: object
+              example: {"project_id": 1, "count": 100, "key_size": 2048}
+    responses:
+      202:
+        description: Job accepted, poll the returned job for progress
+      400:
+        description: Invalid request data
+      429:
+        description: Rate limit for this user exceeded, retry after the Retry-After header
+    """
+    data = request.get_json()
+
+    if not data or 'job_type' not in data or 'created_by' not in data:
+        return jsonify({'error': 'job_type and created_by are required'}), HTTPStatus.BAD_REQUEST
+    if data['job_type'] not in get_job_types():
+        return jsonify({'error': f"job_type must be one of {', '.join(get_job_types())}"}), HTTPStatus.BAD_REQUEST
+
+    job = submit_job(data['job_type'], data.get('params') or {}, data['created_by'])
+
+    response = jsonify(serialize_job(job))
+    response.headers['Location'] = url_for('job.get_job', job_id=job.id)
+    return response, HTTPStatus.ACCEPTED
+
+@bp.route('', methods=['GET'])
+def list_jobs():
+    """
+    List background jobs
+    ---
+    tags:
+      - job
+    parameters:
+      - name: status
+        in: query
+        type: string
+        required: false
+        description: Filter jobs by status
+    responses:
+      200:
+        description: List of jobs, newest first
+    """
+    status = request.args.get('status')
+    query = Job.query
+
+    if status:
+        query = query.filter_by(status=status)
+
+    jobs = query.order_by(Job.id.desc()).all()
+    return jsonify([serialize_job(j) for j in jobs]), HTTPStatus.OK
+
+@bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status and progress of a job
+    ---
+    tags:
+      - job
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job details
+      404:
+        description: Job not found
+    """
+    job = Job.query.get_or_404(job_id)
+    return jsonify(serialize_job(job)), HTTPStatus.OK
+
+@bp.route('/<int:job_id>/cancel', methods=['POST'])
+@log_operation('cancel_job')
+def cancel(job_id):
+    """
+    Cancel a pending or running job
+    ---
+    tags:
+      - job
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      202:
+        description: Cancellation accepted
+      404:
+        description: Job not found
+      409:
+        description: Job already finished
+    """
+    job = Job.query.get_or_404(job_id)
+
+    if job.status in TERMINAL_STATUSES:
+        return jsonify({'error': f'Job is already {job.status}'}), HTTPStatus.CONFLICT
+
+    cancel_job(job)
+    return jsonify(serialize_job(job)), HTTPStatus.ACCEPTED
+
+@bp.route('/<int:job_id>/result', methods=['GET'])
+@log_operation('download_job_result')
+def download_job_result(job_id):
+    """
+    Download the file produced by a job
+    ---
+    tags:
+      - job
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: The result file
+      404:
+        description: Job not found or it has no result file
+    """
+    job = Job.query.get_or_404(job_id)
+    result = json.loads(job.result) if job.result else {}
+
+    if not result.get('file'):
+        return jsonify({'error': 'No result file available for this job'}), HTTPStatus.NOT_FOUND
+
+    path = os.path.join(get_result_dir(), result['file'])
+    if not os.path.exists(path):
+        return jsonify({'error': 'Result file no longer exists'}), HTTPStatus.NOT_FOUND
+
+    return send_file(path, as_attachment=True, download_name=result['file'])
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify
 from models import UserOperation
+from core.serialization import serialize_operation
 from http import HTTPStatus
 
 bp = Blueprint('operation', __name__)
@@ -32,10 +33,4 @@ def list_operations():
                 type: string
     """
     operations = UserOperation.query.order_by(UserOperation.timestamp.desc()).all()
-    return jsonify([{
-        'id': op.id,
-        'username': op.username,
-        'operation': op.operation,
-        'timestamp': op.timestamp.isoformat(),
-        'details': op.details
-    } for op in operations]), HTTPStatus.OK 
\ No newline at end of file
+    return jsonify(serialize_operation.many(operations)), HTTPStatus.OK 
\ No newline at end of file
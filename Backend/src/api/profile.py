@@ -0,0 +1,114 @@
+import io
+from flask import Blueprint, jsonify, request, send_file, current_app, Response
+from http import HTTPStatus
+from core.profiling import get_profile_summary, get_pstats_dump, get_folded_stacks, reset_profiles
+
+bp = Blueprint('profile', __name__)
+
+def profiling_disabled():
+    return jsonify({'error': 'Profiling is disabled, set PROFILING=1 to enable it'}), HTTPStatus.NOT_FOUND
+
+def profile_not_found(endpoint):
+    return jsonify({'error': f'No samples for endpoint {endpoint}'}), HTTPStatus.NOT_FOUND
+
+@bp.route('', methods=['GET'])
+def list_profiles():
+    """
+    Summarise the sampled requests of every endpoint
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: top
+        in: query
+        type: integer
+        required: false
+        default: 20
+        description: Number of functions and allocation sites listed per endpoint
+    responses:
+      200:
+        description: Timings, the functions with the most own time and the largest allocation sites per endpoint
+      404:
+        description: Profiling is disabled
+    """
+    if not current_app.config.get('PROFILING'):
+        return profiling_disabled()
+
+    top = min(max(request.args.get('top', 20, type=int), 1), 200)
+    return jsonify({
+        'sample_rate': current_app.config['PROFILE_SAMPLE_RATE'],
+        'endpoints': get_profile_summary(top)
+    }), HTTPStatus.OK
+
+@bp.route('', methods=['DELETE'])
+def clear_profiles():
+    """
+    Discard all collected samples
+    ---
+    tags:
+      - admin
+    responses:
+      204:
+        description: Samples discarded
+    """
+    reset_profiles()
+    return '', HTTPStatus.NO_CONTENT
+
+@bp.route('/<endpoint>/pstats', methods=['GET'])
+def download_pstats(endpoint):
+    """
+    Download the aggregated cProfile stats of an endpoint
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: endpoint
+        in: path
+        type: string
+        required: true
+        description: Flask endpoint name, e.g. secret.list_secrets
+    produces:
+      - application/octet-stream
+    responses:
+      200:
+        description: A pstats file, open it with python -m pstats, snakeviz or flameprof
+      404:
+        description: No samples for this endpoint
+    """
+    dump = get_pstats_dump(endpoint)
+    if dump is None:
+        return profile_not_found(endpoint)
+
+    return send_file(
+        io.BytesIO(dump),
+        mimetype='application/octet-stream',
+        as_attachment=True,
+        download_name=f'{endpoint}.prof'
+    )
+
+@bp.route('/<endpoint>/flamegraph', methods=['GET'])
+def download_flamegraph(endpoint):
+    """
+    Get the aggregated profile of an endpoint as collapsed stacks
+    ---
+    tags:
+      - admin
+    parameters:
+      - name: endpoint
+        in: path
+        type: string
+        required: true
+        description: Flask endpoint name, e.g. secret.list_secrets
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: One "frame;frame;frame microseconds" line per stack, input for flamegraph.pl or speedscope
+      404:
+        description: No samples for this endpoint
+    """
+    stacks = get_folded_stacks(endpoint)
+    if stacks is None:
+        return profile_not_found(endpoint)
+
+    return Response(stacks, mimetype='text/plain')
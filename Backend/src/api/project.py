@@ -1,11 +1,15 @@
-from flask import Blueprint, jsonify, request
-from models import Project, db
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import select
+from core.keyimport import import_keys, iter_ndjson, iter_zip
+from core.serialization import serialize_project, stream_json_array, STREAM_BATCH_SIZE
+from models import Project, db, delete_projects
 from http import HTTPStatus
-from decorators import log_operation
+from decorators import log_operation, idempotent, admission_control
 
 bp = Blueprint('project', __name__)
 
 @bp.route('', methods=['POST'])
+@idempotent('create_project')
 @log_operation('create_project')
 def create_project():
     """
@@ -14,6 +18,11 @@ def create_project():
     tags:
       - project
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Retries with the same key replay the first response instead of creating a duplicate
       - in: body
         name: body
         schema:
@@ -32,6 +41,10 @@ def create_project():
         description: Project created successfully
       400:
         description: Invalid request data
+      409:
+        description: A request with the same Idempotency-Key is still in progress
+      422:
+        description: Idempotency-Key was already used with a different payload
     """
     data = request.get_json()
     
@@ -46,11 +59,7 @@ def create_project():
     db.session.add(project)
     db.session.commit()
     
-    return jsonify({
-        'id': project.id,
-        'project_name': project.project_name,
-        'description': project.description
-    }), HTTPStatus.CREATED
+    return jsonify(serialize_project(project)), HTTPStatus.CREATED
 
 @bp.route('', methods=['GET'])
 def list_projects():
@@ -63,12 +72,8 @@ def list_projects():
       200:
         description: List of projects
     """
-    projects = Project.query.all()
-    return jsonify([{
-        'id': p.id,
-        'project_name': p.project_name,
-        'description': p.description
-    } for p in projects]), HTTPStatus.OK
+    rows = db.session.execute(select(*serialize_project.columns).execution_options(yield_per=STREAM_BATCH_SIZE))
+    return stream_json_array(rows, serialize_project), HTTPStatus.OK
 
 @bp.route('/<int:project_id>', methods=['GET'])
 def get_project(project_id):
@@ -89,11 +94,7 @@ def get_project(project_id):
         description: Project not found
     """
     project = Project.query.get_or_404(project_id)
-    return jsonify({
-        'id': project.id,
-        'project_name': project.project_name,
-        'description': project.description
-    }), HTTPStatus.OK
+    return jsonify(serialize_project(project)), HTTPStatus.OK
 
 @bp.route('/<int:project_id>', methods=['PUT'])
 def update_project(project_id):
@@ -132,17 +133,13 @@ def update_project(project_id):
     
     db.session.commit()
     
-    return jsonify({
-        'id': project.id,
-        'project_name': project.project_name,
-        'description': project.description
-    }), HTTPStatus.OK
+    return jsonify(serialize_project(project)), HTTPStatus.OK
 
 @bp.route('/<int:project_id>', methods=['DELETE'])
 @log_operation('delete_project')
 def delete_project(project_id):
     """
-    Delete a project
+    Delete a project together with all of its secrets
     ---
     tags:
       - project
@@ -157,8 +154,77 @@ def delete_project(project_id):
       404:
         description: Project not found
     """
-    project = Project.query.get_or_404(project_id)
-    db.session.delete(project)
-    db.session.commit()
+    Project.query.get_or_404(project_id)
+    delete_projects([project_id], chunk_size=current_app.config['DELETE_CHUNK_SIZE'])
     
     return '', HTTPStatus.NO_CONTENT
+
+@bp.route('/<int:project_id>/import', methods=['POST'])
+@admission_control('bulk')
+@log_operation('import_secrets')
+def import_secrets(project_id):
+    """
+    Import existing RSA key pairs into a project
+    ---
+    tags:
+      - project
+    consumes:
+      - application/x-ndjson
+      - application/zip
+    parameters:
+      - name: project_id
+        in: path
+        type: integer
+        required: true
+      - name: created_by
+        in: query
+        type: string
+        required: true
+        description: Default creator for imported secrets
+      - name: description
+        in: query
+        type: string
+        required: false
+        description: Default description for imported secrets
+      - in: body
+        name: body
+        description: >
+          NDJSON with one {"private_key", "public_key", "description", "created_by"} object
+          per line, or a ZIP archive of PEM files paired by directory or file name
+        schema:
+          type: string
+    responses:
+      200:
+        description: Import report with the number of imported keys and per-item errors
+      400:
+        description: Invalid request data
+      404:
+        description: Project not found
+      415:
+        description: Unsupported content type
+      429:
+        description: Rate limit for this user exceeded, retry after the Retry-After header
+    """
+    Project.query.get_or_404(project_id)
+
+    created_by = request.args.get('created_by')
+    if not created_by:
+        return jsonify({'error': 'created_by is required'}), HTTPStatus.BAD_REQUEST
+
+    if request.mimetype in ('application/zip', 'application/x-zip-compressed'):
+        items = iter_zip(request.stream)
+    elif request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+        items = iter_ndjson(request.stream)
+    else:
+        return jsonify({'error': 'Content-Type must be application/x-ndjson or application/zip'}), HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    report = import_keys(
+        project_id,
+        items,
+        created_by=created_by,
+        description=request.args.get('description', 'Imported key pair'),
+        chunk_size=current_app.config['IMPORT_CHUNK_SIZE'],
+        workers=current_app.config['IMPORT_WORKERS'],
+        max_errors=current_app.config['IMPORT_MAX_ERRORS']
+    )
+    return jsonify(report), HTTPStatus.OK
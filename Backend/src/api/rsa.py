@@ -1,17 +1,16 @@
-from flask import Blueprint, jsonify, send_file
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
+from flask import Blueprint, jsonify, send_file, current_app
 import io
 import zipfile
 
-from decorators import log_operation
+from core.keygen import generate_rsa_key_pair_in_pool
+from decorators import log_operation, admission_control
 from models import RSASecretContent
 from extensions import db
 
 bp = Blueprint('rsa_key', __name__)
 
 @bp.route('/generate', methods=['POST'])
+@admission_control('keygen', heavy=True)
 def generate():
     """
     Generate RSA Key Pair
@@ -28,10 +27,14 @@ def generate():
               example: RSA key pair generated and stored successfully.
             public_key:
               type: string
+      429:
+        description: Rate limit for this user exceeded, retry after the Retry-After header
+      503:
+        description: Too many key generations in progress, retry after the Retry-After header
       500:
         description: Internal server error
     """
-    private_pem, public_pem = generate_rsa_key_pair()
+    private_pem, public_pem = generate_rsa_key_pair_in_pool(workers=current_app.config['IMPORT_WORKERS'])
     store_rsa_keys(private_pem, public_pem)
     return jsonify({
         'message': 'RSA key pair generated and stored successfully.',
@@ -122,26 +125,6 @@ def download_keys(id):
         download_name=f'rsa_keys_user_{id}.zip'
     )
 
-def generate_rsa_key_pair():
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
-    )
-    private_pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption()
-    ).decode('utf-8')
-
-    public_key = private_key.public_key()
-    public_pem = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    ).decode('utf-8')
-
-    return private_pem, public_pem
-
 def store_rsa_keys(private_pem, public_pem):
     existing_keys = RSASecretContent.query.filter_by().first()
     if existing_keys:
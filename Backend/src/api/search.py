@@ -0,0 +1,61 @@
+from flask import Blueprint, jsonify, request
+from http import HTTPStatus
+from core.search import search, INDEXED_ENTITIES
+
+bp = Blueprint('search', __name__)
+
+MAX_LIMIT = 100
+
+@bp.route('', methods=['GET'])
+def search_inventory():
+    """
+    Full-text search over projects, secrets and audit records
+    ---
+    tags:
+      - search
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Search terms, every word is prefix matched
+      - name: type
+        in: query
+        type: string
+        required: false
+        description: Comma separated entity types to search (project, secret, operation)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 20
+    responses:
+      200:
+        description: Matches ordered by relevance
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              type:
+                type: string
+              id:
+                type: integer
+              title:
+                type: string
+              body:
+                type: string
+      400:
+        description: Invalid query parameters
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), HTTPStatus.BAD_REQUEST
+
+    entity_types = [t for t in request.args.get('type', '').split(',') if t] or list(INDEXED_ENTITIES)
+    unknown_types = [t for t in entity_types if t not in INDEXED_ENTITIES]
+    if unknown_types:
+        return jsonify({'error': f"Unknown type: {', '.join(unknown_types)}"}), HTTPStatus.BAD_REQUEST
+
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_LIMIT)
+    return jsonify(search(query, entity_types, limit)), HTTPStatus.OK
@@ -1,14 +1,18 @@
-from flask import Blueprint, jsonify, request, send_file
-from models import Secret, RSASecretContent, db
+from flask import Blueprint, jsonify, request, send_file, current_app
+from sqlalchemy import select
+from models import Secret, RSASecretContent, db, delete_secrets
+from core.serialization import serialize_secret, stream_json_array, STREAM_BATCH_SIZE
 from http import HTTPStatus
 from datetime import datetime, UTC
 import io
 import zipfile
-from decorators import log_operation
+from decorators import log_operation, idempotent, admission_control
 
 bp = Blueprint('secret', __name__)
 
 @bp.route('', methods=['POST'])
+@idempotent('create_secret')
+@admission_control('keygen', heavy=True)
 @log_operation('create_secret')
 def create_secret():
     """
@@ -17,6 +21,11 @@ def create_secret():
     tags:
       - secret
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Retries with the same key replay the first response instead of creating a duplicate
       - in: body
         name: body
         schema:
@@ -47,6 +56,14 @@ def create_secret():
         description: Secret created successfully
       400:
         description: Invalid request data
+      409:
+        description: A request with the same Idempotency-Key is still in progress
+      422:
+        description: Idempotency-Key was already used with a different payload
+      429:
+        description: Rate limit for this user exceeded, retry after the Retry-After header
+      503:
+        description: Too many key generations in progress, retry after the Retry-After header
     """
     data = request.get_json()
     
@@ -67,8 +84,8 @@ def create_secret():
     
     # If it's an RSA secret, generate the key pair
     if data['secret_type_id'] == 1:  # Assuming 1 is RSA type
-        from api.rsa import generate_rsa_key_pair
-        private_pem, public_pem = generate_rsa_key_pair()
+        from core.keygen import generate_rsa_key_pair_in_pool
+        private_pem, public_pem = generate_rsa_key_pair_in_pool(workers=current_app.config['IMPORT_WORKERS'])
         
         rsa_content = RSASecretContent(
             private_key=private_pem,
@@ -81,14 +98,7 @@ def create_secret():
     
     db.session.commit()
     
-    return jsonify({
-        'id': secret.id,
-        'description': secret.description,
-        'created_by': secret.created_by,
-        'created_at': secret.created_at.isoformat(),
-        'project_id': secret.project_id,
-        'secret_type_id': secret.secret_type_id
-    }), HTTPStatus.CREATED
+    return jsonify(serialize_secret(secret)), HTTPStatus.CREATED
 
 @bp.route('', methods=['GET'])
 def list_secrets():
@@ -108,20 +118,14 @@ def list_secrets():
         description: List of secrets
     """
     project_id = request.args.get('project_id', type=int)
-    query = Secret.query
+    # Plain column rows skip the ORM identity map, and are streamed in id order
+    statement = select(*serialize_secret.columns).order_by(Secret.id)
     
     if project_id:
-        query = query.filter_by(project_id=project_id)
+        statement = statement.where(Secret.project_id == project_id)
     
-    secrets = query.all()
-    return jsonify([{
-        'id': s.id,
-        'description': s.description,
-        'created_by': s.created_by,
-        'created_at': s.created_at.isoformat(),
-        'project_id': s.project_id,
-        'secret_type_id': s.secret_type_id
-    } for s in secrets]), HTTPStatus.OK
+    rows = db.session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+    return stream_json_array(rows, serialize_secret), HTTPStatus.OK
 
 @bp.route('/<int:secret_id>', methods=['GET'])
 def get_secret(secret_id):
@@ -142,14 +146,7 @@ def get_secret(secret_id):
         description: Secret not found
     """
     secret = Secret.query.get_or_404(secret_id)
-    return jsonify({
-        'id': secret.id,
-        'description': secret.description,
-        'created_by': secret.created_by,
-        'created_at': secret.created_at.isoformat(),
-        'project_id': secret.project_id,
-        'secret_type_id': secret.secret_type_id
-    }), HTTPStatus.OK
+    return jsonify(serialize_secret(secret)), HTTPStatus.OK
 
 @bp.route('/<int:secret_id>', methods=['PUT'])
 def update_secret(secret_id):
@@ -184,14 +181,7 @@ def update_secret(secret_id):
     
     db.session.commit()
     
-    return jsonify({
-        'id': secret.id,
-        'description': secret.description,
-        'created_by': secret.created_by,
-        'created_at': secret.created_at.isoformat(),
-        'project_id': secret.project_id,
-        'secret_type_id': secret.secret_type_id
-    }), HTTPStatus.OK
+    return jsonify(serialize_secret(secret)), HTTPStatus.OK
 
 @bp.route('/<int:secret_id>', methods=['DELETE'])
 @log_operation('delete_secret')
@@ -212,16 +202,51 @@ def delete_secret(secret_id):
       404:
         description: Secret not found
     """
-    secret = Secret.query.get_or_404(secret_id)
+    Secret.query.get_or_404(secret_id)
+    delete_secrets([secret_id])
+    
+    return '', HTTPStatus.NO_CONTENT
+
+@bp.route('', methods=['DELETE'])
+@log_operation('delete_secrets')
+def delete_secrets_bulk():
+    """
+    Delete several secrets at once
+    ---
+    tags:
+      - secret
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required:
+            - ids
+          properties:
+            ids:
+              type: array
+              items:
+                type: integer
+              example: [1, 2, 3]
+    responses:
+      200:
+        description: Secrets deleted, ids that did not exist are reported as not_found
+      400:
+        description: Invalid request data
+    """
+    data = request.get_json(silent=True)
     
-    # Delete associated RSA content if exists
-    if secret.rsa_content:
-        db.session.delete(secret.rsa_content)
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return jsonify({'error': 'ids must be a list of integers'}), HTTPStatus.BAD_REQUEST
     
-    db.session.delete(secret)
-    db.session.commit()
+    deleted = delete_secrets(list(dict.fromkeys(ids)), chunk_size=current_app.config['DELETE_CHUNK_SIZE'])
+    deleted_ids = set(deleted)
     
-    return '', HTTPStatus.NO_CONTENT
+    return jsonify({
+        'deleted': len(deleted),
+        'not_found': [i for i in dict.fromkeys(ids) if i not in deleted_ids]
+    }), HTTPStatus.OK
 
 @bp.route('/<int:secret_id>/download', methods=['GET'])
 @log_operation('download_secret')
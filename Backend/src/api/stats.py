@@ -0,0 +1,43 @@
+from flask import Blueprint, jsonify, request
+from http import HTTPStatus
+from core.stats import get_stats, compute_live_stats, diff_stats
+
+bp = Blueprint('stats', __name__)
+
+@bp.route('', methods=['GET'])
+def inventory_stats():
+    """
+    Get secret counts in total, per project, per type and per creator
+    ---
+    tags:
+      - stats
+    parameters:
+      - name: verify
+        in: query
+        type: boolean
+        required: false
+        default: false
+        description: Also run live GROUP BY queries and report counters that drifted
+    responses:
+      200:
+        description: Inventory statistics, keyed by project id, secret type id and username
+        schema:
+          properties:
+            total:
+              type: integer
+            by_project:
+              type: object
+            by_type:
+              type: object
+            by_creator:
+              type: object
+            drift:
+              type: object
+              description: Only present when verify is set, empty when counters are correct
+    """
+    stats = get_stats()
+
+    if request.args.get('verify', 'false').lower() in ('1', 'true', 'yes'):
+        stats['drift'] = diff_stats(stats, compute_live_stats())
+
+    return jsonify(stats), HTTPStatus.OK
@@ -6,18 +6,20 @@ from flask_cors import CORS
 
 environment = os.getenv('FLASK_ENV', 'dev')
 
-app = create_app(config_by_name[environment])
-# Enable CORS for all routes
-CORS(app, resources={
-    r"/api/*": {
-        "origins": [
-            "http://localhost:3000",  # Your frontend development server
-            "http://localhost:5173",  # Vite's default port
-        ]
-    }
-})
+# Process pool workers import this script again as __mp_main__, they only need the pool modules
+if __name__ != '__mp_main__':
+    app = create_app(config_by_name[environment])
+    # Enable CORS for all routes
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": [
+                "http://localhost:3000",  # Your frontend development server
+                "http://localhost:5173",  # Vite's default port
+            ]
+        }
+    })
 
-app.register_blueprint(operation.bp, url_prefix='/api/operations')
+    app.register_blueprint(operation.bp, url_prefix='/api/operations')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -6,6 +6,56 @@ class Config:
     TESTING = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI') or 'sqlite:///sqlite.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DELETE_CHUNK_SIZE = 500  # rows removed per transaction by bulk deletes
+    SQLITE_WAL = True  # readers and online backups do not block writers
+    SQLITE_BUSY_TIMEOUT = 5000  # milliseconds a writer waits for the lock
+
+    # Online backups
+    BACKUP_DIR = os.environ.get('BACKUP_DIR')  # defaults to <instance>/backups
+    BACKUP_PAGES_PER_STEP = 4096  # pages copied per backup step
+    BACKUP_STEP_SLEEP = 0.005  # seconds to pause between steps
+    BACKUP_COMPRESS_LEVEL = 1  # gzip level, low levels keep hourly backups cheap
+    BACKUP_KEEP = 48  # snapshots kept, older ones are deleted
+
+    # Background jobs
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))  # threads of the run-jobs command
+    JOB_POLL_INTERVAL = 5  # seconds between scans for pending jobs
+    JOB_STALE_AFTER = 120  # seconds without a heartbeat before a running job is resumed
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RESULT_DIR = os.environ.get('JOB_RESULT_DIR')  # defaults to <instance>/jobs
+
+    # Idempotency-Key support for create endpoints
+    IDEMPOTENCY_TTL = 24 * 60 * 60  # seconds a stored response can be replayed
+    IDEMPOTENCY_CACHE_SIZE = 1024  # responses kept in the in-memory front cache
+    IDEMPOTENCY_LOCK_TIMEOUT = 60  # seconds before an unfinished request is considered abandoned
+    IDEMPOTENCY_WAIT_TIMEOUT = 30  # seconds a duplicate waits for the in-flight request
+    IDEMPOTENCY_MAX_WAITERS = 2  # duplicates waiting at once per process, more get 409 straight away
+
+    # Bulk key import
+    IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', 0)) or None  # processes for imports and key generation, defaults to the CPU count
+    IMPORT_CHUNK_SIZE = 200  # key pairs validated and inserted per transaction
+    IMPORT_MAX_ERRORS = 1000  # per-item errors listed in the report
+
+    # Change feed
+    CHANGE_RETENTION_DAYS = 7  # older changes are pruned, clients behind that must resync
+
+    # Admission control, limits apply per process
+    ADMISSION_CONTROL = True
+    RATE_LIMITS = {  # endpoint class -> (requests per second, burst) for each user
+        'keygen': (1, 10),  # RSA key generation
+        'bulk': (0.1, 3),  # imports and background jobs
+    }
+    RATE_LIMIT_MAX_USERS = 10000  # buckets kept in memory, idle ones are dropped first
+    HEAVY_CONCURRENCY = 2  # CPU-heavy requests running at once, the other threads stay free for reads
+    HEAVY_QUEUE_SIZE = 2  # requests waiting for a slot, more are rejected with 503 at once
+    HEAVY_QUEUE_TIMEOUT = 5  # seconds a queued request waits before it is rejected
+
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')  # auto uses orjson when installed, json forces the standard library
+
+    # Sampled request profiling, served from /api/admin/profiles
+    PROFILING = os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes')
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))  # share of requests profiled
+    PROFILE_MEMORY = True  # also trace allocations of sampled requests with tracemalloc
 
 class DevelopmentConfig(Config):
     """Development configuration."""
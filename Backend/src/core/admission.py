@@ -0,0 +1,66 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# (endpoint class, user) -> (tokens, last refill), least recently used first
+_buckets = OrderedDict()
+_buckets_lock = threading.Lock()
+
+# Concurrency cap shared by every CPU-heavy handler in this process
+_slots = {'running': 0, 'waiting': 0}
+_slots_condition = threading.Condition()
+
+
+def take_token(key, rate: float, burst: int, max_buckets: int) -> int:
+    """Take one token from the bucket of ``key``.
+
+    Returns 0 when the request is admitted, otherwise the whole seconds
+    until the bucket holds a token again, for the Retry-After header.
+    """
+    now = time.monotonic()
+    with _buckets_lock:
+        tokens, refilled_at = _buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - refilled_at) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0
+        else:
+            retry_after = max(1, math.ceil((1 - tokens) / rate))
+        _buckets[key] = (tokens, now)
+
+        # Forgetting an idle bucket only refills it early
+        while len(_buckets) > max_buckets:
+            _buckets.popitem(last=False)
+    return retry_after
+
+
+def acquire_slot(limit: int, queue_size: int, timeout: float) -> bool:
+    """Wait for one of ``limit`` heavy slots.
+
+    At most ``queue_size`` requests wait, in arrival order. Returns False
+    straight away when the queue is full, or when no slot frees up within
+    ``timeout`` seconds. Waiting requests hold a server thread, so the queue
+    is kept short to leave threads for cheap requests.
+    """
+    with _slots_condition:
+        if _slots['running'] < limit and not _slots['waiting']:
+            _slots['running'] += 1
+            return True
+        if _slots['waiting'] >= queue_size:
+            return False
+
+        _slots['waiting'] += 1
+        try:
+            is_acquired = _slots_condition.wait_for(lambda: _slots['running'] < limit, timeout)
+        finally:
+            _slots['waiting'] -= 1
+        if is_acquired:
+            _slots['running'] += 1
+        return is_acquired
+
+
+def release_slot():
+    with _slots_condition:
+        _slots['running'] -= 1
+        _slots_condition.notify()
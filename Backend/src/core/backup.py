@@ -0,0 +1,173 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, UTC
+
+from flask import current_app
+from extensions import db
+
+SNAPSHOT_SUFFIX = '.db.gz'
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def get_database_path() -> str:
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise ValueError('Backups are only supported for file based SQLite databases')
+    return url.database
+
+
+def get_backup_dir(app=None) -> str:
+    app = app or current_app
+    backup_dir = app.config.get('BACKUP_DIR') or os.path.join(app.instance_path, 'backups')
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(snapshot_path: str) -> str:
+    return snapshot_path[:-len(SNAPSHOT_SUFFIX)] + '.json'
+
+
+def create_snapshot(db_path: str, backup_dir: str, pages_per_step: int = 4096, step_sleep: float = 0.0,
+                    compress_level: int = 1, keep: int | None = None, progress=None) -> dict:
+    """Copy the live database into a compressed, checksummed snapshot.
+
+    The source connection holds a read transaction for the whole copy. In
+    WAL mode that pins one consistent version of the database without
+    blocking writers, and the page-by-page copy never restarts when other
+    connections commit. ``progress(copied_pages, total_pages)`` is called
+    after every step.
+    """
+    name = f"snapshot-{datetime.now(UTC).strftime('%Y%m%dT%H%M%S%fZ')}"
+    raw_path = os.path.join(backup_dir, f'{name}.db.part')
+    snapshot_path = os.path.join(backup_dir, f'{name}{SNAPSHOT_SUFFIX}')
+    started = time.monotonic()
+
+    def on_step(status, remaining, total):
+        if progress: progress(total - remaining, total)
+        # Leave the disk to the application between steps
+        if step_sleep: time.sleep(step_sleep)
+
+    source = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        source.execute('BEGIN')
+        source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()  # starts the read transaction
+        page_count = source.execute('PRAGMA page_count').fetchone()[0]
+        page_size = source.execute('PRAGMA page_size').fetchone()[0]
+        target = sqlite3.connect(raw_path)
+        try:
+            source.backup(target, pages=pages_per_step, progress=on_step)
+        except BaseException:
+            target.close()
+            os.remove(raw_path)
+            raise
+        target.close()
+        source.execute('COMMIT')
+    finally:
+        source.close()
+
+    try:
+        db_sha256 = _sha256(raw_path)
+        with open(raw_path, 'rb') as raw, gzip.open(f'{snapshot_path}.part', 'wb', compresslevel=compress_level) as compressed:
+            shutil.copyfileobj(raw, compressed, COPY_CHUNK_SIZE)
+    finally:
+        os.remove(raw_path)
+    os.replace(f'{snapshot_path}.part', snapshot_path)
+
+    manifest = {
+        'name': name,
+        'snapshot_file': os.path.basename(snapshot_path),
+        'created_at': datetime.now(UTC).isoformat(),
+        'page_count': page_count,
+        'page_size': page_size,
+        'database_bytes': page_count * page_size,
+        'snapshot_bytes': os.path.getsize(snapshot_path),
+        'sha256': _sha256(snapshot_path),
+        'db_sha256': db_sha256,
+        'duration_seconds': round(time.monotonic() - started, 3)
+    }
+    with open(_manifest_path(snapshot_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if keep: prune_snapshots(backup_dir, keep)
+    return manifest
+
+
+def list_snapshots(backup_dir: str) -> list[dict]:
+    """Return the manifests of all snapshots, newest first"""
+    manifests = []
+    for path in glob.glob(os.path.join(backup_dir, f'snapshot-*{SNAPSHOT_SUFFIX}')):
+        try:
+            with open(_manifest_path(path), encoding='utf-8') as f:
+                manifests.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(manifests, key=lambda m: m['name'], reverse=True)
+
+
+def prune_snapshots(backup_dir: str, keep: int):
+    for manifest in list_snapshots(backup_dir)[keep:]:
+        snapshot_path = os.path.join(backup_dir, manifest['snapshot_file'])
+        for path in (snapshot_path, _manifest_path(snapshot_path)):
+            if os.path.exists(path): os.remove(path)
+
+
+def verify_snapshot(snapshot_path: str) -> dict:
+    """Check the snapshot file against its manifest, raising ValueError on mismatch"""
+    if not snapshot_path.endswith(SNAPSHOT_SUFFIX) or not os.path.exists(snapshot_path):
+        raise ValueError(f'Snapshot {snapshot_path} not found')
+    try:
+        with open(_manifest_path(snapshot_path), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f'Manifest for {snapshot_path} is missing or unreadable')
+
+    if _sha256(snapshot_path) != manifest['sha256']:
+        raise ValueError('Snapshot checksum does not match its manifest')
+    return manifest
+
+
+def restore_snapshot(snapshot_path: str, db_path: str) -> dict:
+    """Replace the database content with a verified snapshot.
+
+    The snapshot is decompressed next to the database, checked for checksum
+    and integrity, then copied in with the backup API so connections that are
+    still open see the restored content rather than a swapped file.
+    """
+    manifest = verify_snapshot(snapshot_path)
+    temp_path = f'{db_path}.restore'
+
+    try:
+        with gzip.open(snapshot_path, 'rb') as compressed, open(temp_path, 'wb') as raw:
+            shutil.copyfileobj(compressed, raw, COPY_CHUNK_SIZE)
+        if _sha256(temp_path) != manifest['db_sha256']:
+            raise ValueError('Decompressed database checksum does not match its manifest')
+
+        source = sqlite3.connect(temp_path)
+        try:
+            if source.execute('PRAGMA integrity_check').fetchone()[0] != 'ok':
+                raise ValueError('Snapshot failed the SQLite integrity check')
+            target = sqlite3.connect(db_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    finally:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+    return manifest
@@ -0,0 +1,110 @@
+import json
+import time
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import event, func, inspect
+from extensions import db
+from core.serialization import serialize_project, serialize_secret, serialize_operation
+from models import Change, Project, Secret, RSASecretContent, UserOperation
+
+PRUNE_INTERVAL = 60 * 60  # seconds between sweeps of expired changes
+
+
+def _rsa_key_data(rsa_content):
+    # Never put key material into the feed
+    return {
+        'id': rsa_content.id,
+        'key_size': rsa_content.key_size
+    }
+
+
+# entity type -> (model, serializer, columns whose update produces a change)
+TRACKED_ENTITIES = {
+    'project': (Project, serialize_project, ('project_name', 'description')),
+    'secret': (Secret, serialize_secret, ('description', 'created_by', 'project_id', 'secret_type_id')),
+    'rsa_key': (RSASecretContent, _rsa_key_data, ('private_key', 'public_key', 'key_size')),
+    'operation': (UserOperation, serialize_operation, ()),
+}
+
+_last_prune = 0.0
+
+
+def get_latest_seq() -> int:
+    return db.session.query(func.max(Change.seq)).scalar() or 0
+
+
+def get_changes(since: int, limit: int) -> list[Change]:
+    # SQLite serialises writers, so seq order is also commit order and a
+    # reader can never observe seq N+1 before seq N is committed
+    return Change.query.filter(Change.seq > since).order_by(Change.seq).limit(limit).all()
+
+
+def is_since_expired(since: int) -> bool:
+    """True when changes after ``since`` were pruned, or ``since`` is ahead of the feed.
+
+    A client ahead of the newest change saw a sequence that a restore from
+    an older snapshot rolled back, so changes reusing those numbers would
+    be skipped. Both cases need a full reload.
+    """
+    oldest, newest = db.session.query(func.min(Change.seq), func.max(Change.seq)).one()
+    if newest is None:
+        return since > 0
+    return since < oldest - 1 or since > newest
+
+
+def prune_changes(retention_days: int):
+    global _last_prune
+    if time.monotonic() - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = time.monotonic()
+
+    cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+    # Always keep the newest row so the sequence survives a quiet period
+    newest = db.session.query(func.max(Change.seq)).scalar()
+    Change.query.filter(Change.timestamp < cutoff, Change.seq != newest).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def record_deleted(entity_type: str, entity_ids):
+    """Record deletions made with bulk statements that bypass ORM events"""
+    if not entity_ids:
+        return
+    db.session.execute(Change.__table__.insert(), [{
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': 'deleted',
+        'timestamp': datetime.now(UTC)
+    } for entity_id in entity_ids])
+
+
+def _insert_change(connection, target, entity_type, action, data):
+    connection.execute(Change.__table__.insert().values(
+        entity_type=entity_type,
+        entity_id=target.id,
+        action=action,
+        data=json.dumps(data) if data is not None else None,
+        timestamp=datetime.now(UTC)
+    ))
+
+
+def _register_listeners(entity_type, model, serializer, tracked_columns):
+    def record_created(mapper, connection, target):
+        _insert_change(connection, target, entity_type, 'created', serializer(target))
+
+    def record_updated(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[column].history.has_changes() for column in tracked_columns):
+            _insert_change(connection, target, entity_type, 'updated', serializer(target))
+
+    def record_deleted_entity(mapper, connection, target):
+        _insert_change(connection, target, entity_type, 'deleted', None)
+
+    # Mapper events run on the flushing connection, so a change row commits
+    # or rolls back together with the mutation it describes
+    event.listen(model, 'after_insert', record_created)
+    event.listen(model, 'after_update', record_updated)
+    event.listen(model, 'after_delete', record_deleted_entity)
+
+
+for _entity_type, (_model, _serializer, _tracked_columns) in TRACKED_ENTITIES.items():
+    _register_listeners(_entity_type, _model, _serializer, _tracked_columns)
@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from extensions import db
 from flasgger import Swagger
@@ -9,21 +10,49 @@ def create_app(config_object):
     app = Flask(__name__)
     
     configure_app(app, config_object)
+    configure_json(app)
     configure_extensions(app)
     register_blueprints(app)
     configure_swagger(app)
     initialize_database(app)
     configure_logging(app)
     register_error_handlers(app)
+    configure_search(app)
+    configure_changes(app)
+    configure_stats(app)
+    configure_backups(app)
+    configure_jobs(app)
+    configure_profiling(app)
     
     return app
 
 def configure_app(app, config_object):
     app.config.from_object(config_object)
 
+def configure_json(app):
+    from core.serialization import get_json_provider_class
+    app.json = get_json_provider_class(app.config['JSON_ENCODER'])(app)
+
 def configure_extensions(app):
     # Initialize Flask extensions
     db.init_app(app)
+    configure_sqlite(app)
+
+def configure_sqlite(app):
+    from sqlalchemy import event
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers, including online backups, run without blocking the writer
+        if app.config.get('SQLITE_WAL'): cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f"PRAGMA busy_timeout={app.config.get('SQLITE_BUSY_TIMEOUT', 5000)}")
+        cursor.close()
 
 def configure_swagger(app):
     swagger_config = {
@@ -71,10 +100,22 @@ def register_blueprints(app):
     from api.rsa import bp as keys_bp
     from api.project import bp as project_bp
     from api.secret import bp as secret_bp
+    from api.job import bp as job_bp
+    from api.search import bp as search_bp
+    from api.change import bp as change_bp
+    from api.stats import bp as stats_bp
+    from api.backup import bp as backup_bp
+    from api.profile import bp as profile_bp
     
     app.register_blueprint(keys_bp, url_prefix='/api/keys')
     app.register_blueprint(project_bp, url_prefix='/api/projects')
     app.register_blueprint(secret_bp, url_prefix='/api/secrets')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(change_bp, url_prefix='/api/changes')
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    app.register_blueprint(backup_bp, url_prefix='/api/admin/backups')
+    app.register_blueprint(profile_bp, url_prefix='/api/admin/profiles')
 
 def initialize_database(app):
     with app.app_context():
@@ -82,6 +123,95 @@ def initialize_database(app):
         from models import initialize_secret_types
         initialize_secret_types()
 
+def configure_search(app):
+    from core.search import init_search, rebuild_search_index
+    init_search(app)
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the full-text search index from the source tables"""
+        print(f'Indexed {rebuild_search_index()} rows')
+
+def configure_changes(app):
+    # Importing the module registers the change listeners
+    import core.changes
+
+def configure_stats(app):
+    from core.stats import init_stats, rebuild_stats
+    init_stats(app)
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_command():
+        """Recompute the inventory counters from the secrets table"""
+        print(f"Counted {rebuild_stats()['total']} secrets")
+
+def configure_backups(app):
+    import click
+    from core.backup import create_snapshot, restore_snapshot, get_backup_dir, get_database_path
+
+    @app.cli.command('backup-db')
+    def backup_db_command():
+        """Write a compressed snapshot of the live database"""
+        def report(copied, total):
+            print(f'\rCopied {copied}/{total} pages', end='', flush=True)
+
+        manifest = create_snapshot(
+            get_database_path(),
+            get_backup_dir(),
+            pages_per_step=app.config['BACKUP_PAGES_PER_STEP'],
+            step_sleep=app.config['BACKUP_STEP_SLEEP'],
+            compress_level=app.config['BACKUP_COMPRESS_LEVEL'],
+            keep=app.config['BACKUP_KEEP'],
+            progress=report
+        )
+        print(f"\nWrote {manifest['snapshot_file']} ({manifest['snapshot_bytes']} bytes, sha256 {manifest['sha256']})")
+
+    @app.cli.command('restore-db')
+    @click.argument('snapshot')
+    @click.confirmation_option(prompt='This replaces the whole database. Stop the app first. Continue?')
+    def restore_db_command(snapshot):
+        """Restore the database from a snapshot file or snapshot name"""
+        if not os.path.exists(snapshot):
+            snapshot = os.path.join(get_backup_dir(), snapshot if snapshot.endswith('.db.gz') else f'{snapshot}.db.gz')
+        manifest = restore_snapshot(snapshot, get_database_path())
+        print(f"Restored {manifest['name']} taken at {manifest['created_at']}")
+
+def configure_jobs(app):
+    import click
+    # Importing tasks registers the job handlers
+    import tasks
+    from core.jobs import run_job_workers
+
+    @app.cli.command('run-jobs')
+    @click.option('--workers', type=int, default=None, help='Worker threads, defaults to JOB_WORKERS')
+    def run_jobs_command(workers):
+        """Run background jobs in this process until it is stopped"""
+        worker_count = workers or app.config['JOB_WORKERS']
+        if worker_count < 1:
+            raise click.UsageError('At least one job worker is needed')
+        print(f'Running {worker_count} job worker(s), press Ctrl+C to stop')
+        run_job_workers(app, worker_count)
+
+def configure_profiling(app):
+    # Without the flag no hooks are registered, so requests pay nothing
+    if not app.config.get('PROFILING'):
+        return
+
+    from flask import g, request
+    from core.profiling import begin_request, end_request
+
+    @app.before_request
+    def start_request_profile():
+        # Every request is counted, so samples that overlap another one can be dropped
+        is_sampled = request.endpoint and request.endpoint != 'static' and not request.endpoint.startswith('profile.')
+        sample_rate = app.config['PROFILE_SAMPLE_RATE'] if is_sampled else 0
+        g.profile_sample = begin_request(sample_rate, app.config['PROFILE_MEMORY'])
+
+    @app.teardown_request
+    def finish_request_profile(error):
+        if 'profile_sample' in g:
+            end_request(g.pop('profile_sample'), request.endpoint)
+
 def configure_logging(app):
     import logging
     logging.basicConfig(level=app.config.get('LOG_LEVEL', 'INFO'))
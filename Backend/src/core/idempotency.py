@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, UTC
+
+from flask import current_app, request
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import IdempotencyKey
+
+PURGE_INTERVAL = 60  # seconds between sweeps of expired keys
+
+# (scope, key) -> completed record, most recently used last
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# (scope, key) -> [lock, number of requests holding or waiting for it]
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+# Requests of this process waiting for a duplicate to finish, each holds a server thread
+_waiters = {'count': 0}
+_waiters_lock = threading.Lock()
+
+_last_purge = 0.0
+
+
+def _utcnow():
+    # SQLite hands DateTime columns back as naive values, so compare in naive UTC
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def fingerprint_request() -> str:
+    """Hash the method, path and payload so a reused key with a different body can be rejected"""
+    body = request.get_data()
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode('utf-8')
+    except ValueError:
+        pass
+
+    digest = hashlib.sha256()
+    digest.update(f'{request.method} {request.path}\n'.encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _waiting(max_waiters: int):
+    """Count the current request as a waiter, yields False when ``max_waiters`` already wait"""
+    with _waiters_lock:
+        is_admitted = _waiters['count'] < max_waiters
+        if is_admitted: _waiters['count'] += 1
+    try:
+        yield is_admitted
+    finally:
+        if is_admitted:
+            with _waiters_lock:
+                _waiters['count'] -= 1
+
+
+@contextmanager
+def hold_key(scope: str, key: str, timeout: float, max_waiters: int):
+    """Serialise requests for the same key within this process.
+
+    Yields False if the lock could not be acquired within ``timeout``, or
+    straight away when ``max_waiters`` requests are already waiting.
+    """
+    cache_key = (scope, key)
+    with _key_locks_lock:
+        entry = _key_locks.setdefault(cache_key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    acquired = entry[0].acquire(blocking=False)
+    if not acquired:
+        with _waiting(max_waiters) as is_admitted:
+            acquired = is_admitted and entry[0].acquire(timeout=timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired: entry[0].release()
+        with _key_locks_lock:
+            entry[1] -= 1
+            if not entry[1]: _key_locks.pop(cache_key, None)
+
+
+def _cache_get(scope: str, key: str) -> dict | None:
+    with _cache_lock:
+        record = _cache.get((scope, key))
+        if not record:
+            return None
+        if record['expires_at'] < _utcnow():
+            del _cache[(scope, key)]
+            return None
+        _cache.move_to_end((scope, key))
+        return record
+
+
+def _cache_put(scope: str, key: str, record: dict):
+    with _cache_lock:
+        _cache[(scope, key)] = record
+        _cache.move_to_end((scope, key))
+        while len(_cache) > current_app.config.get('IDEMPOTENCY_CACHE_SIZE', 1024):
+            _cache.popitem(last=False)
+
+
+def _to_record(row: IdempotencyKey) -> dict:
+    return {
+        'fingerprint': row.fingerprint,
+        'status_code': row.status_code,
+        'body': row.response_body,
+        'mimetype': row.mimetype,
+        'expires_at': row.expires_at
+    }
+
+
+def _purge_expired():
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = time.monotonic()
+    IdempotencyKey.query.filter(IdempotencyKey.expires_at < _utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def begin(scope: str, key: str, fingerprint: str) -> tuple[str, dict | None]:
+    """Claim a key for the current request.
+
+    Returns ('replay', record) when a completed response is stored,
+    ('acquired', None) when the caller should execute the request, and
+    ('busy', None) while another process is still executing it.
+    """
+    record = _cache_get(scope, key)
+    if record:
+        return 'replay', record
+
+    _purge_expired()
+    now = _utcnow()
+    row = db.session.get(IdempotencyKey, (scope, key), populate_existing=True)
+
+    if row and row.expires_at < now:
+        db.session.delete(row)
+        db.session.commit()
+        row = None
+
+    if row and row.status_code is not None:
+        record = _to_record(row)
+        _cache_put(scope, key, record)
+        return 'replay', record
+
+    if row:
+        # Take over a request whose worker died before storing a response
+        lock_timeout = timedelta(seconds=current_app.config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60))
+        if row.locked_at >= now - lock_timeout:
+            return 'busy', None
+
+        claimed = IdempotencyKey.query.filter_by(
+            scope=scope, key=key, locked_at=row.locked_at, status_code=None
+        ).update({'locked_at': now, 'fingerprint': fingerprint}, synchronize_session=False)
+        db.session.commit()
+        return ('acquired', None) if claimed else ('busy', None)
+
+    db.session.add(IdempotencyKey(
+        scope=scope,
+        key=key,
+        fingerprint=fingerprint,
+        locked_at=now,
+        expires_at=now + timedelta(seconds=current_app.config.get('IDEMPOTENCY_TTL', 86400))
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return 'busy', None
+    return 'acquired', None
+
+
+def wait_to_begin(scope: str, key: str, fingerprint: str, timeout: float, max_waiters: int) -> tuple[str, dict | None]:
+    """Call begin until no other process is executing the request.
+
+    Returns ('busy', None) after ``timeout`` seconds, or straight away when
+    ``max_waiters`` requests are already waiting.
+    """
+    outcome, record = begin(scope, key, fingerprint)
+    if outcome != 'busy':
+        return outcome, record
+
+    deadline = time.monotonic() + timeout
+    with _waiting(max_waiters) as is_admitted:
+        while is_admitted and time.monotonic() < deadline:
+            time.sleep(0.1)
+            outcome, record = begin(scope, key, fingerprint)
+            if outcome != 'busy':
+                break
+    return outcome, record
+
+
+def finish(scope: str, key: str, response):
+    """Store the response of the request that owns the key"""
+    row = db.session.get(IdempotencyKey, (scope, key), populate_existing=True)
+    if not row:
+        return
+
+    row.status_code = response.status_code
+    row.response_body = response.get_data(as_text=True)
+    row.mimetype = response.mimetype
+    db.session.commit()
+    _cache_put(scope, key, _to_record(row))
+
+
+def abandon(scope: str, key: str):
+    """Release a key whose request failed, so a retry executes it again"""
+    db.session.rollback()
+    IdempotencyKey.query.filter_by(scope=scope, key=key, status_code=None).delete(synchronize_session=False)
+    db.session.commit()
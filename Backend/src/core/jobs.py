@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+
+from flask import current_app
+from extensions import db
+from metadata import JobStatus
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+# job_type -> handler(job, params) returning a JSON-serialisable result
+_handlers = {}
+
+TERMINAL_STATUSES = {JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+
+
+class JobCancelled(Exception):
+    """Raised from report_progress when a cancellation was requested"""
+
+
+def job_handler(job_type: str):
+    """Register a function as the handler for a job type.
+
+    Handlers receive the Job row and its decoded params. They must be
+    resumable: after a restart the same job is handed to the handler again,
+    with ``job.progress`` and ``job.cursor`` holding the last reported checkpoint.
+    """
+    def decorator(f):
+        _handlers[job_type] = f
+        return f
+    return decorator
+
+
+def get_job_types() -> list[str]:
+    return sorted(_handlers)
+
+
+def submit_job(job_type: str, params: dict, created_by: str) -> Job:
+    """Persist a new pending job, the job runner claims it on its next poll"""
+    if job_type not in _handlers:
+        raise ValueError(f'Unknown job type: {job_type}')
+
+    job = Job(
+        job_type=job_type,
+        params=json.dumps(params),
+        created_by=created_by,
+        created_at=datetime.now(UTC)
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def cancel_job(job: Job) -> Job:
+    """Cancel a pending job immediately, or flag a running one for cancellation"""
+    if job.status == JobStatus.PENDING.value:
+        job.status = JobStatus.CANCELLED.value
+        job.finished_at = datetime.now(UTC)
+    job.cancel_requested = True
+    db.session.commit()
+    return job
+
+
+def report_progress(job: Job, progress: int, total: int | None = None, cursor: int | None = None):
+    """Checkpoint a running job.
+
+    Commits the current session, so any rows the handler added since the
+    last checkpoint are persisted atomically with the new progress. Raises
+    JobCancelled if a cancellation was requested in the meantime.
+    """
+    job.progress = progress
+    if total is not None: job.total = total
+    if cursor is not None: job.cursor = cursor
+    job.heartbeat_at = datetime.now(UTC)
+    db.session.commit()
+
+    # The commit expired the instance, so this re-reads the flag from the database
+    if job.cancel_requested: raise JobCancelled()
+
+
+def get_result_dir(app=None) -> str:
+    app = app or current_app
+    result_dir = app.config.get('JOB_RESULT_DIR') or os.path.join(app.instance_path, 'jobs')
+    os.makedirs(result_dir, exist_ok=True)
+    return result_dir
+
+
+def run_job_workers(app, worker_count: int):
+    """Run the background worker threads in this process until it is stopped.
+
+    Started by the ``run-jobs`` CLI command, so key generation and other
+    CPU-heavy jobs never compete with the web process for the GIL. Jobs
+    live in the database and are claimed with an atomic status update, so
+    several runners can share it. Jobs left running by a killed runner are
+    picked up again once their heartbeat goes stale, pending jobs are
+    claimed as soon as a runner starts.
+    """
+    state = {
+        'wakeup': threading.Event(),
+        'running': set(),
+        'lock': threading.Lock(),
+    }
+    for index in range(worker_count):
+        thread = threading.Thread(
+            target=_worker_loop,
+            args=(app, state),
+            name=f'job-worker-{index}',
+            daemon=True
+        )
+        thread.start()
+
+    logger.info('Started %d job worker(s)', worker_count)
+    # The workers are daemon threads, sleeping here keeps Ctrl+C working
+    while True:
+        time.sleep(60)
+
+
+def _worker_loop(app, state):
+    poll_interval = app.config.get('JOB_POLL_INTERVAL', 5)
+    while True:
+        job_id = None
+        try:
+            with app.app_context():
+                _recover_stale_jobs(app, state)
+                job_id = _claim_next_job(state)
+                if job_id: _run_job(job_id)
+        except Exception:
+            logger.exception('Job worker iteration failed')
+        finally:
+            if job_id:
+                with state['lock']:
+                    state['running'].discard(job_id)
+
+        if job_id: continue
+        state['wakeup'].wait(poll_interval)
+        state['wakeup'].clear()
+
+
+def _recover_stale_jobs(app, state):
+    cutoff = datetime.now(UTC) - timedelta(seconds=app.config.get('JOB_STALE_AFTER', 120))
+    with state['lock']:
+        local_ids = set(state['running'])
+
+    stale = Job.query.filter(
+        Job.status == JobStatus.RUNNING.value,
+        Job.heartbeat_at < cutoff,
+        Job.id.notin_(local_ids)
+    )
+    if not stale.first():
+        return
+
+    max_attempts = app.config.get('JOB_MAX_ATTEMPTS', 3)
+    stale.filter(Job.attempts >= max_attempts).update({
+        'status': JobStatus.FAILED.value,
+        'error': 'Job exceeded the maximum number of attempts',
+        'finished_at': datetime.now(UTC)
+    }, synchronize_session=False)
+    resumed = stale.filter(Job.attempts < max_attempts).update(
+        {'status': JobStatus.PENDING.value}, synchronize_session=False
+    )
+    db.session.commit()
+    if resumed: logger.info('Resuming %d stale job(s)', resumed)
+
+
+def _claim_next_job(state) -> int | None:
+    candidates = db.session.query(Job.id).filter(
+        Job.status == JobStatus.PENDING.value,
+        Job.cancel_requested.is_(False)
+    ).order_by(Job.id).limit(5).all()
+
+    for (job_id,) in candidates:
+        now = datetime.now(UTC)
+        claimed = Job.query.filter_by(id=job_id, status=JobStatus.PENDING.value).update({
+            'status': JobStatus.RUNNING.value,
+            'started_at': now,
+            'heartbeat_at': now,
+            'attempts': Job.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            with state['lock']:
+                state['running'].add(job_id)
+            return job_id
+    return None
+
+
+def _run_job(job_id: int):
+    job = db.session.get(Job, job_id)
+    handler = _handlers.get(job.job_type)
+
+    try:
+        if not handler: raise ValueError(f'No handler registered for job type {job.job_type}')
+        result = handler(job, json.loads(job.params or '{}'))
+        job.status = JobStatus.SUCCEEDED.value
+        job.result = json.dumps(result) if result is not None else None
+    except JobCancelled:
+        db.session.rollback()
+        job.status = JobStatus.CANCELLED.value
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Job %s failed', job_id)
+        job.status = JobStatus.FAILED.value
+        job.error = str(e)
+
+    job.finished_at = datetime.now(UTC)
+    db.session.commit()
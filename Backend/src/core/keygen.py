@@ -0,0 +1,42 @@
+from concurrent.futures.process import BrokenProcessPool
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.backends import default_backend
+
+from core.process_pool import get_process_pool, reset_process_pool
+
+
+def generate_rsa_key_pair(key_size=2048):
+    private_key = rsa.generate_private_key(
+        public_exponent=65537,
+        key_size=key_size,
+        backend=default_backend()
+    )
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode('utf-8')
+
+    public_key = private_key.public_key()
+    public_pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8')
+
+    return private_pem, public_pem
+
+
+def generate_rsa_key_pair_in_pool(key_size=2048, workers: int | None = None):
+    """Generate a key pair in the process pool and wait for it.
+
+    The request thread only waits, so cheap requests keep the GIL. Call it
+    from handlers under admission_control(heavy=True), whose concurrency
+    cap bounds how many key pairs are queued in the pool.
+    """
+    try:
+        return get_process_pool(workers).submit(generate_rsa_key_pair, key_size).result()
+    except BrokenProcessPool:
+        reset_process_pool()
+        raise
@@ -0,0 +1,199 @@
+import json
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, UTC
+from itertools import islice
+
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from core.process_pool import get_process_pool, reset_process_pool
+
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024  # archives larger than this are spooled to disk
+_PAIR_SUFFIX = re.compile(r'[_.\-]?(private|public)([_.\-]?key)?$', re.IGNORECASE)
+
+
+def validate_key_item(item: dict) -> dict:
+    """Parse and check one key pair, runs in a pool process.
+
+    Returns the normalised PEMs and key size, or {'error': message}.
+    """
+    private_pem = item.get('private_key')
+    if not private_pem:
+        return {'error': 'private_key is required'}
+
+    try:
+        private_key = serialization.load_pem_private_key(private_pem.encode('utf-8'), password=None)
+        if not isinstance(private_key, rsa.RSAPrivateKey):
+            return {'error': 'private_key is not an RSA key'}
+
+        public_key = private_key.public_key()
+        if item.get('public_key'):
+            provided = serialization.load_pem_public_key(item['public_key'].encode('utf-8'))
+            if not isinstance(provided, rsa.RSAPublicKey) or provided.public_numbers() != public_key.public_numbers():
+                return {'error': 'public_key does not match private_key'}
+    except (ValueError, TypeError, UnsupportedAlgorithm) as e:
+        # cryptography attaches OpenSSL error details as extra args, keep only the message
+        return {'error': str(e.args[0]) if e.args else 'Invalid PEM data'}
+
+    # Store keys in the same formats as generate_rsa_key_pair
+    return {
+        'private_key': private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ).decode('utf-8'),
+        'public_key': public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode('utf-8'),
+        'key_size': private_key.key_size
+    }
+
+
+def iter_ndjson(stream):
+    """Yield (reference, item) for every line of an NDJSON body without buffering it"""
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield f'line {line_number}', {'error': 'Invalid JSON'}
+            continue
+        if not isinstance(item, dict):
+            yield f'line {line_number}', {'error': 'Each line must be a JSON object'}
+            continue
+        yield f'line {line_number}', item
+
+
+def _pair_key(name: str) -> str:
+    directory, file_name = posixpath.split(name)
+    stem = _PAIR_SUFFIX.sub('', posixpath.splitext(file_name)[0])
+    return posixpath.join(directory, stem) if stem else directory
+
+
+def _read_metadata(text: str) -> dict:
+    # metadata.txt as written by download_secret and the archive_project job
+    metadata = {}
+    for line in text.splitlines():
+        field, _, value = line.partition(':')
+        if field.strip() in ('Description', 'Created By'):
+            metadata[field.strip().lower().replace(' ', '_')] = value.strip()
+    return metadata
+
+
+def iter_zip(stream):
+    """Yield (reference, item) for every key pair in a ZIP archive.
+
+    Pairs are matched by directory and file name, e.g. ``secret_1/private_key.pem``
+    with ``secret_1/public_key.pem`` or ``app_private.pem`` with ``app_public.pem``.
+    The upload is spooled to a temporary file, so only one pair is held in
+    memory at a time.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+        shutil.copyfileobj(stream, spool)
+        spool.seek(0)
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile:
+            yield 'archive', {'error': 'Not a valid ZIP archive'}
+            return
+
+        with archive:
+            groups = {}
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.filename.lower().endswith(('.pem', '.key', '.pub')):
+                    groups.setdefault(_pair_key(info.filename), []).append(info.filename)
+                elif posixpath.basename(info.filename) == 'metadata.txt':
+                    groups.setdefault(posixpath.dirname(info.filename), []).append(info.filename)
+
+            for reference, names in groups.items():
+                item = {}
+                for name in names:
+                    text = archive.read(name).decode('utf-8', errors='replace')
+                    if name.endswith('metadata.txt'):
+                        item.update(_read_metadata(text))
+                    elif 'PRIVATE KEY' in text:
+                        item['private_key'] = text
+                    elif 'PUBLIC KEY' in text:
+                        item['public_key'] = text
+                if 'private_key' in item or 'public_key' in item:
+                    yield reference or '/', item
+
+
+def import_keys(project_id: int, items, created_by: str, description: str,
+                chunk_size: int = 200, workers: int | None = None, max_errors: int = 1000) -> dict:
+    """Validate key pairs in a process pool and insert them as RSA secrets.
+
+    Items are consumed in chunks: while one chunk is being inserted in its
+    own transaction, the next one is already being validated, and at most
+    two chunks are held in memory.
+    """
+    from models import RSASecretContent, Secret, SecretTypeModel, db
+    from metadata import SecretType
+
+    rsa_type_id = SecretTypeModel.query.filter_by(name=SecretType.RSA.value).first().id
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    def add_error(reference, message):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'item': reference, 'error': message})
+        else:
+            report['errors_truncated'] = True
+
+    def submit(chunk):
+        pool = get_process_pool(workers)
+        payload = [{'private_key': item.get('private_key'), 'public_key': item.get('public_key')} for _, item in chunk]
+        return chunk, pool.map(validate_key_item, payload, chunksize=max(1, len(chunk) // 16))
+
+    def store(chunk, results):
+        try:
+            results = list(results)
+        except BrokenProcessPool:
+            reset_process_pool()
+            raise
+
+        secrets = []
+        for (reference, item), result in zip(chunk, results):
+            error = item.get('error') or result.get('error')
+            if error:
+                add_error(reference, error)
+                continue
+
+            rsa_content = RSASecretContent(
+                private_key=result['private_key'],
+                public_key=result['public_key'],
+                key_size=result['key_size']
+            )
+            secrets.append(Secret(
+                description=item.get('description') or description,
+                created_by=item.get('created_by') or created_by,
+                created_at=datetime.now(UTC),
+                project_id=project_id,
+                secret_type_id=rsa_type_id,
+                rsa_content=rsa_content
+            ))
+
+        db.session.add_all(secrets)
+        db.session.commit()
+        report['imported'] += len(secrets)
+
+    items = iter(items)
+    pending = None
+    while chunk := list(islice(items, chunk_size)):
+        submitted = submit(chunk)
+        if pending: store(*pending)
+        pending = submitted
+    if pending: store(*pending)
+
+    return report
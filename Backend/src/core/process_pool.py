@@ -0,0 +1,37 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Modules the workers import up front, they must need nothing but cryptography
+WORKER_MODULES = ['core.keyimport', 'core.keygen']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int | None) -> ProcessPoolExecutor:
+    """Return the process pool for CPU-heavy work, creating it on first use.
+
+    Key imports and key generation share it, so RSA math never holds the
+    GIL of a process serving requests. Callers bound their own submissions,
+    the pool queue is unbounded.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Workers are not forked from the server, whose other threads may hold OpenSSL or logging locks
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                # The default preload is __main__, which would build a whole app in the fork server
+                context.set_forkserver_preload(WORKER_MODULES)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _pool
+
+
+def reset_process_pool():
+    """Discard a broken pool, the next call to get_process_pool starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool: _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
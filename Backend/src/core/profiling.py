@@ -0,0 +1,190 @@
+import cProfile
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MAX_ALLOCATION_SITES = 500  # allocation sites kept per endpoint
+MAX_STACK_DEPTH = 64
+
+# endpoint -> aggregated samples
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+# tracemalloc, and cProfile from Python 3.12 on, record every thread of the
+# interpreter, so a sample is only started while its request runs alone,
+# and dropped when another request started before it finished
+_in_flight = {'count': 0, 'sample': None}
+_in_flight_lock = threading.Lock()
+
+
+def begin_request(sample_rate: float, trace_memory: bool, frames: int = 1):
+    """Count a request as in flight and profile it if it is picked, returns the sample or None"""
+    with _in_flight_lock:
+        _in_flight['count'] += 1
+        if _in_flight['sample']:
+            _in_flight['sample']['overlapped'] = True
+            return None
+        if _in_flight['count'] > 1 or random.random() >= sample_rate:
+            return None
+
+        profile = cProfile.Profile()
+        traced = trace_memory and not tracemalloc.is_tracing()
+        try:
+            if traced: tracemalloc.start(frames)
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this interpreter
+            if traced: tracemalloc.stop()
+            return None
+        _in_flight['sample'] = {'profile': profile, 'traced': traced, 'overlapped': False, 'started': time.perf_counter()}
+        return _in_flight['sample']
+
+
+def end_request(sample: dict | None, endpoint: str):
+    """Count a request as finished, and add its sample to the totals of its endpoint"""
+    with _in_flight_lock:
+        _in_flight['count'] -= 1
+        if not sample:
+            return
+        _in_flight['sample'] = None
+        sample['profile'].disable()
+        seconds = time.perf_counter() - sample['started']
+        peak_bytes = snapshot = None
+        if sample['traced']:
+            if not sample['overlapped']:
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    # Allocations still alive when the request ended
+    sites = snapshot.statistics('lineno')[:MAX_ALLOCATION_SITES] if snapshot else []
+    with _profiles_lock:
+        entry = _profiles.setdefault(endpoint, {
+            'requests': 0,
+            'dropped': 0,
+            'seconds': 0.0,
+            'max_seconds': 0.0,
+            'stats': None,
+            'peak_bytes_total': 0,
+            'peak_bytes_max': 0,
+            'allocated_bytes': Counter(),
+            'allocated_blocks': Counter()
+        })
+        if sample['overlapped']:
+            entry['dropped'] += 1
+            return
+
+        entry['requests'] += 1
+        entry['seconds'] += seconds
+        entry['max_seconds'] = max(entry['max_seconds'], seconds)
+        if entry['stats'] is None:
+            entry['stats'] = pstats.Stats(sample['profile'])
+        else:
+            entry['stats'].add(sample['profile'])
+
+        if peak_bytes is not None:
+            entry['peak_bytes_total'] += peak_bytes
+            entry['peak_bytes_max'] = max(entry['peak_bytes_max'], peak_bytes)
+        for stat in sites:
+            frame = stat.traceback[0]
+            site = f'{frame.filename}:{frame.lineno}'
+            entry['allocated_bytes'][site] += stat.size
+            entry['allocated_blocks'][site] += stat.count
+        if len(entry['allocated_bytes']) > 2 * MAX_ALLOCATION_SITES:
+            entry['allocated_bytes'] = Counter(dict(entry['allocated_bytes'].most_common(MAX_ALLOCATION_SITES)))
+
+
+def _label(func) -> str:
+    file_name, line, name = func
+    return f'{name} ({os.path.basename(file_name)}:{line})' if line else name
+
+
+def get_profile_summary(top: int = 20) -> list[dict]:
+    """Per endpoint timings, the functions with the most own time and the top allocation sites.
+
+    ``dropped`` counts samples discarded because other requests overlapped them.
+    """
+    summary = []
+    with _profiles_lock:
+        for endpoint, entry in sorted(_profiles.items()):
+            stats = entry['stats'].stats if entry['stats'] else {}
+            functions = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+            requests = max(entry['requests'], 1)
+            summary.append({
+                'endpoint': endpoint,
+                'requests': entry['requests'],
+                'dropped': entry['dropped'],
+                'avg_seconds': round(entry['seconds'] / requests, 6),
+                'max_seconds': round(entry['max_seconds'], 6),
+                'avg_peak_bytes': entry['peak_bytes_total'] // requests,
+                'max_peak_bytes': entry['peak_bytes_max'],
+                'functions': [{
+                    'function': _label(func),
+                    'calls': calls,
+                    'own_seconds': round(own, 6),
+                    'cumulative_seconds': round(cumulative, 6)
+                } for func, (_, calls, own, cumulative, _) in functions],
+                'allocations': [{
+                    'site': site,
+                    'bytes': size,
+                    'blocks': entry['allocated_blocks'][site]
+                } for site, size in entry['allocated_bytes'].most_common(top)]
+            })
+    return summary
+
+
+def get_pstats_dump(endpoint: str) -> bytes | None:
+    """The aggregated profile in the file format of pstats.Stats.dump_stats"""
+    with _profiles_lock:
+        entry = _profiles.get(endpoint)
+        return marshal.dumps(entry['stats'].stats) if entry and entry['stats'] else None
+
+
+def get_folded_stacks(endpoint: str, min_share: float = 0.001) -> str | None:
+    """The aggregated profile as collapsed stacks for flamegraph.pl or speedscope.
+
+    cProfile only records caller/callee pairs, so the time of a function
+    called from several places is split between them in proportion to the
+    time each caller spent in it. Paths under ``min_share`` of the total
+    are dropped. Values are microseconds.
+    """
+    with _profiles_lock:
+        entry = _profiles.get(endpoint)
+        if not entry or not entry['stats']:
+            return None
+        stats = dict(entry['stats'].stats)
+
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, value in stats.items() if not value[4]]
+    min_seconds = sum(stats[func][3] for func in roots) * min_share
+
+    lines = Counter()
+
+    def walk(func, path, on_path, share):
+        path = f'{path};{_label(func)}' if path else _label(func)
+        lines[path] += stats[func][2] * share
+        if len(on_path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_seconds in callees.get(func, ()):
+            callee_seconds = stats[callee][3]
+            if callee in on_path or not callee_seconds or edge_seconds * share < min_seconds:
+                continue
+            walk(callee, path, on_path | {callee}, share * edge_seconds / callee_seconds)
+
+    for root in roots:
+        if stats[root][3] >= min_seconds:
+            walk(root, '', {root}, 1.0)
+    return ''.join(f'{path} {round(seconds * 1e6)}\n' for path, seconds in lines.items() if seconds * 1e6 >= 1)
+
+
+def reset_profiles():
+    with _profiles_lock:
+        _profiles.clear()
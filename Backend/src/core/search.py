@@ -0,0 +1,166 @@
+import re
+
+from sqlalchemy import bindparam, event, inspect, or_, text
+from extensions import db
+from models import Project, Secret, UserOperation
+
+# entity type -> (model, type code, title column, body column)
+# The FTS rowid encodes both the entity and its type (id * 4 + code), so rows
+# can be replaced or removed by rowid without scanning the index.
+INDEXED_ENTITIES = {
+    'project': (Project, 1, 'project_name', 'description'),
+    'secret': (Secret, 2, 'description', 'created_by'),
+    'operation': (UserOperation, 3, 'operation', 'username'),
+}
+_TYPE_BY_CODE = {code: entity_type for entity_type, (_, code, _, _) in INDEXED_ENTITIES.items()}
+
+_fts_enabled = False
+
+
+def _rowid(entity_type: str, entity_id: int) -> int:
+    return entity_id * 4 + INDEXED_ENTITIES[entity_type][1]
+
+
+def init_search(app):
+    """Create the SQLite FTS5 index, building it from existing rows on first use.
+
+    On other databases, or SQLite builds without FTS5, search falls back to
+    LIKE queries against the source tables.
+    """
+    global _fts_enabled
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            return
+
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        )).first()
+        try:
+            db.session.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+                "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.warning('SQLite FTS5 is not available, search falls back to LIKE queries')
+            return
+
+        _fts_enabled = True
+        if not exists: rebuild_search_index()
+
+
+def rebuild_search_index() -> int:
+    """Repopulate the whole index from the source tables"""
+    if not _fts_enabled:
+        return 0
+
+    db.session.execute(text('DELETE FROM search_index'))
+    for model, code, title, body in INDEXED_ENTITIES.values():
+        db.session.execute(text(
+            f"INSERT INTO search_index (rowid, title, body) "
+            f"SELECT id * 4 + {code}, COALESCE({title}, ''), COALESCE({body}, '') FROM {model.__tablename__}"
+        ))
+    db.session.commit()
+    return db.session.execute(text('SELECT COUNT(*) FROM search_index')).scalar()
+
+
+def remove_from_index(entity_type: str, entity_ids):
+    """Drop index rows for entities removed with bulk statements that bypass ORM events"""
+    if not _fts_enabled or not entity_ids:
+        return
+    db.session.execute(
+        text('DELETE FROM search_index WHERE rowid IN :rowids').bindparams(
+            bindparam('rowids', expanding=True)
+        ),
+        {'rowids': [_rowid(entity_type, entity_id) for entity_id in entity_ids]}
+    )
+
+
+def _build_match(query: str) -> str | None:
+    # Quote every word so user input can never be parsed as FTS5 syntax,
+    # and prefix-match them so search-as-you-type finds partial words
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(query: str, entity_types: list[str], limit: int) -> list[dict]:
+    """Return the best matching projects, secrets and operations"""
+    if not _fts_enabled:
+        return _search_like(query, entity_types, limit)
+
+    match = _build_match(query)
+    if not match:
+        return []
+
+    codes = [INDEXED_ENTITIES[entity_type][1] for entity_type in entity_types]
+    rows = db.session.execute(
+        text(
+            'SELECT rowid, title, body FROM search_index '
+            'WHERE search_index MATCH :match AND rowid % 4 IN :codes '
+            'ORDER BY rank LIMIT :limit'
+        ).bindparams(bindparam('codes', expanding=True)),
+        {'match': match, 'codes': codes, 'limit': limit}
+    )
+    return [{
+        'type': _TYPE_BY_CODE[row.rowid % 4],
+        'id': row.rowid // 4,
+        'title': row.title,
+        'body': row.body
+    } for row in rows]
+
+
+def _search_like(query: str, entity_types: list[str], limit: int) -> list[dict]:
+    pattern = f'%{query.strip()}%'
+    results = []
+    for entity_type in entity_types:
+        model, _, title, body = INDEXED_ENTITIES[entity_type]
+        title_column, body_column = getattr(model, title), getattr(model, body)
+        rows = db.session.query(model.id, title_column, body_column).filter(
+            or_(title_column.ilike(pattern), body_column.ilike(pattern))
+        ).limit(limit - len(results)).all()
+        results.extend({
+            'type': entity_type,
+            'id': row[0],
+            'title': row[1] or '',
+            'body': row[2] or ''
+        } for row in rows)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def _register_listeners(entity_type, model, title, body):
+    def index_entity(mapper, connection, target):
+        if not _fts_enabled:
+            return
+        rowid = _rowid(entity_type, target.id)
+        connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'), {'rowid': rowid})
+        connection.execute(
+            text('INSERT INTO search_index (rowid, title, body) VALUES (:rowid, :title, :body)'),
+            {'rowid': rowid, 'title': getattr(target, title) or '', 'body': getattr(target, body) or ''}
+        )
+
+    def reindex_entity(mapper, connection, target):
+        state = inspect(target)
+        if state.attrs[title].history.has_changes() or state.attrs[body].history.has_changes():
+            index_entity(mapper, connection, target)
+
+    def unindex_entity(mapper, connection, target):
+        if not _fts_enabled:
+            return
+        connection.execute(
+            text('DELETE FROM search_index WHERE rowid = :rowid'),
+            {'rowid': _rowid(entity_type, target.id)}
+        )
+
+    event.listen(model, 'after_insert', index_entity)
+    event.listen(model, 'after_update', reindex_entity)
+    event.listen(model, 'after_delete', unindex_entity)
+
+
+for _entity_type, (_model, _, _title, _body) in INDEXED_ENTITIES.items():
+    _register_listeners(_entity_type, _model, _title, _body)
@@ -0,0 +1,109 @@
+from datetime import datetime
+from itertools import islice
+from operator import attrgetter
+
+from flask import Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from models import Project, Secret, UserOperation
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library encoder is used without it
+    orjson = None
+
+STREAM_BATCH_SIZE = 1000  # items encoded per chunk of a streamed array
+
+
+class ModelSerializer:
+    """Turns model instances, or rows selecting ``columns``, into response dicts.
+
+    The field list, the attribute getter and the datetime fields are worked
+    out once per model instead of on every call.
+    """
+
+    def __init__(self, model, fields):
+        self.fields = tuple(fields)
+        self.columns = tuple(getattr(model, field) for field in self.fields)
+        getter = attrgetter(*self.fields)
+        self._get_values = getter if len(self.fields) > 1 else lambda obj: (getter(obj),)
+        self._datetime_fields = tuple(
+            field for field in self.fields
+            if model.__table__.c[field].type.python_type is datetime
+        )
+
+    def __call__(self, obj) -> dict:
+        data = dict(zip(self.fields, self._get_values(obj)))
+        for field in self._datetime_fields:
+            if data[field] is not None:
+                data[field] = data[field].isoformat()
+        return data
+
+    def many(self, objs) -> list[dict]:
+        return [self(obj) for obj in objs]
+
+
+serialize_project = ModelSerializer(Project, ('id', 'project_name', 'description'))
+serialize_secret = ModelSerializer(Secret, ('id', 'description', 'created_by', 'created_at', 'project_id', 'secret_type_id'))
+serialize_operation = ModelSerializer(UserOperation, ('id', 'username', 'operation', 'timestamp', 'details'))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Keeps the behaviour of the default provider: sorted keys when
+    ``sort_keys`` is set, dates formatted by its ``default`` function and
+    non-string keys converted. Non-ASCII characters are written as UTF-8
+    rather than escaped.
+    """
+
+    def dumps_bytes(self, obj, indent=False, sort_keys=None) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys: option |= orjson.OPT_SORT_KEYS
+        if indent: option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj, indent=bool(kwargs.get('indent')), sort_keys=kwargs.get('sort_keys')).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def get_json_provider_class(encoder: str):
+    """Provider class for the JSON_ENCODER setting: auto, orjson or json"""
+    if encoder == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_ENCODER is orjson but orjson is not installed')
+    if encoder == 'orjson' or (encoder == 'auto' and orjson is not None):
+        return OrjsonProvider
+    return DefaultJSONProvider
+
+
+def encode_json(obj) -> bytes:
+    """Compact JSON bytes from the app's provider"""
+    provider = current_app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def stream_json_array(items, serializer, batch_size: int = STREAM_BATCH_SIZE) -> Response:
+    """Respond with a JSON array that is encoded and sent a batch at a time.
+
+    ``items`` is consumed lazily, so a listing backed by a streaming query
+    never holds more than one batch of rows and dicts in memory.
+    """
+    def generate():
+        items_iter = iter(items)
+        separator = b''
+        yield b'['
+        while batch := list(islice(items_iter, batch_size)):
+            yield separator + encode_json([serializer(item) for item in batch])[1:-1]
+            separator = b','
+        yield b']\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,128 @@
+from collections import Counter
+
+from sqlalchemy import event, func, inspect
+from extensions import db
+from models import InventoryStat, Secret
+
+# dimension -> Secret column it counts by; 'total' has a single row with an empty key
+DIMENSIONS = {
+    'project': 'project_id',
+    'type': 'secret_type_id',
+    'creator': 'created_by',
+}
+_stats_table = InventoryStat.__table__
+
+
+def _secret_values(secret) -> dict:
+    return {column: getattr(secret, column) for column in DIMENSIONS.values()}
+
+
+def _secret_deltas(values: dict, sign: int) -> Counter:
+    deltas = Counter({('total', ''): sign})
+    for dimension, column in DIMENSIONS.items():
+        deltas[(dimension, str(values[column]))] += sign
+    return deltas
+
+
+def _apply_deltas(connection, deltas: Counter):
+    for (dimension, key), delta in deltas.items():
+        if not delta:
+            continue
+        updated = connection.execute(
+            _stats_table.update()
+            .where(_stats_table.c.dimension == dimension, _stats_table.c.key == key)
+            .values(count=_stats_table.c.count + delta)
+        ).rowcount
+        if not updated:
+            connection.execute(_stats_table.insert().values(dimension=dimension, key=key, count=delta))
+
+
+def init_stats(app):
+    """Build the counters from the secrets table on first start"""
+    with app.app_context():
+        if not db.session.get(InventoryStat, ('total', '')):
+            rebuild_stats()
+
+
+def rebuild_stats() -> dict:
+    """Recompute every counter with GROUP BY queries, repairing any drift"""
+    db.session.query(InventoryStat).delete(synchronize_session=False)
+    live = compute_live_stats()
+    db.session.add(InventoryStat(dimension='total', key='', count=live['total']))
+    for dimension in DIMENSIONS:
+        db.session.add_all(
+            InventoryStat(dimension=dimension, key=key, count=count)
+            for key, count in live[f'by_{dimension}'].items()
+        )
+    db.session.commit()
+    return live
+
+
+def get_stats() -> dict:
+    """Read the maintained counters, cost depends on the number of keys, not secrets"""
+    stats = {'total': 0, **{f'by_{dimension}': {} for dimension in DIMENSIONS}}
+    for row in InventoryStat.query.filter(InventoryStat.count > 0):
+        if row.dimension == 'total':
+            stats['total'] = row.count
+        else:
+            stats[f'by_{row.dimension}'][row.key] = row.count
+    return stats
+
+
+def compute_live_stats() -> dict:
+    """Aggregate the secrets table directly, used for rebuilds and verification"""
+    stats = {'total': db.session.query(func.count(Secret.id)).scalar()}
+    for dimension, column in DIMENSIONS.items():
+        rows = db.session.query(getattr(Secret, column), func.count(Secret.id)).group_by(getattr(Secret, column))
+        stats[f'by_{dimension}'] = {str(key): count for key, count in rows}
+    return stats
+
+
+def diff_stats(counters: dict, live: dict) -> dict:
+    """List every counter that disagrees with the live aggregate"""
+    drift = {}
+    if counters['total'] != live['total']:
+        drift['total'] = {'counter': counters['total'], 'live': live['total']}
+    for dimension in DIMENSIONS:
+        name = f'by_{dimension}'
+        for key in counters[name].keys() | live[name].keys():
+            counter, actual = counters[name].get(key, 0), live[name].get(key, 0)
+            if counter != actual:
+                drift.setdefault(name, {})[key] = {'counter': counter, 'live': actual}
+    return drift
+
+
+def decrement_secret_stats(rows):
+    """Update counters for secrets removed with bulk statements that bypass ORM events.
+
+    ``rows`` must carry the project_id, secret_type_id and created_by columns.
+    """
+    deltas = Counter()
+    for row in rows:
+        deltas.update(_secret_deltas(row._mapping, -1))
+    _apply_deltas(db.session.connection(), deltas)
+
+
+@event.listens_for(Secret, 'after_insert')
+def _count_inserted_secret(mapper, connection, target):
+    _apply_deltas(connection, _secret_deltas(_secret_values(target), 1))
+
+
+# before_delete, so any expired columns can still be loaded from the row
+@event.listens_for(Secret, 'before_delete')
+def _count_deleted_secret(mapper, connection, target):
+    _apply_deltas(connection, _secret_deltas(_secret_values(target), -1))
+
+
+@event.listens_for(Secret, 'after_update')
+def _count_updated_secret(mapper, connection, target):
+    state = inspect(target)
+    deltas = Counter()
+    for dimension, column in DIMENSIONS.items():
+        history = state.attrs[column].history
+        if not history.has_changes():
+            continue
+        for old_value in history.deleted:
+            deltas[(dimension, str(old_value))] -= 1
+        deltas[(dimension, str(getattr(target, column)))] += 1
+    _apply_deltas(connection, deltas)
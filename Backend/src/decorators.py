@@ -1,5 +1,6 @@
 from functools import wraps
-from flask import request, g
+from flask import request, g, jsonify, make_response, current_app, Response
+from http import HTTPStatus
 from models import UserOperation, db
 import json
 
@@ -18,7 +19,7 @@ def log_operation(operation_type):
             
             try:
                 # Get user_id from request (assuming it's in the created_by field)
-                username = data.get('created_by', 'anonymous')
+                username = data.get('created_by') or request.args.get('created_by', 'anonymous')
                 
                 # Prepare details
                 details = {
@@ -26,7 +27,7 @@ def log_operation(operation_type):
                     'method': request.method,
                     'params': dict(request.args),
                     'body': data,
-                    'resource_id': kwargs.get('project_id') or kwargs.get('secret_id')
+                    'resource_id': kwargs.get('project_id') or kwargs.get('secret_id') or kwargs.get('job_id')
                 }
                 
                 # Create operation record
@@ -45,4 +46,102 @@ def log_operation(operation_type):
                 
             return response
         return decorated_function
-    return decorator 
\ No newline at end of file
+    return decorator
+
+def idempotent(scope):
+    """Replay the stored response when a request repeats its Idempotency-Key header.
+
+    Must wrap log_operation so replayed requests are not logged again, and
+    admission_control so replays cost no rate limit tokens or heavy slots.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from core.idempotency import fingerprint_request, hold_key, wait_to_begin, finish, abandon
+
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return f(*args, **kwargs)
+            if len(key) > 255:
+                return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), HTTPStatus.BAD_REQUEST
+
+            fingerprint = fingerprint_request()
+            wait_timeout = current_app.config.get('IDEMPOTENCY_WAIT_TIMEOUT', 30)
+            max_waiters = current_app.config.get('IDEMPOTENCY_MAX_WAITERS', 2)
+            busy_response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+            busy_response.headers['Retry-After'] = '1'
+
+            with hold_key(scope, key, wait_timeout, max_waiters) as is_acquired:
+                if not is_acquired:
+                    return busy_response, HTTPStatus.CONFLICT
+
+                outcome, record = wait_to_begin(scope, key, fingerprint, wait_timeout, max_waiters)
+                if outcome == 'busy':
+                    return busy_response, HTTPStatus.CONFLICT
+
+                if outcome == 'replay':
+                    if record['fingerprint'] != fingerprint:
+                        return jsonify({'error': 'Idempotency-Key was already used with a different request'}), HTTPStatus.UNPROCESSABLE_ENTITY
+                    replayed = Response(record['body'], status=record['status_code'], mimetype=record['mimetype'])
+                    replayed.headers['Idempotent-Replayed'] = 'true'
+                    return replayed
+
+                try:
+                    response = make_response(f(*args, **kwargs))
+                except Exception:
+                    abandon(scope, key)
+                    raise
+
+                # Server errors and rate limit rejections are not stored, so the client can retry them
+                if response.status_code >= 500 or response.status_code == HTTPStatus.TOO_MANY_REQUESTS or response.is_streamed:
+                    abandon(scope, key)
+                else:
+                    finish(scope, key, response)
+                return response
+        return decorated_function
+    return decorator 
+
+def _admission_user():
+    # Same identity as log_operation, falling back to the client address
+    data = request.get_json(silent=True) if request.is_json else None
+    user = request.args.get('created_by') or (data.get('created_by') if isinstance(data, dict) else None)
+    return user or f'ip:{request.remote_addr}'
+
+def admission_control(endpoint_class, heavy=False):
+    """Rate limit an endpoint per user, and cap how many heavy requests run at once.
+
+    Rejected requests get 429 or 503 with Retry-After before any work is done.
+    Place it below idempotent, so stored responses are replayed without
+    being limited, and above log_operation.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from core.admission import take_token, acquire_slot, release_slot
+
+            config = current_app.config
+            if not config.get('ADMISSION_CONTROL'):
+                return f(*args, **kwargs)
+
+            if endpoint_class in config['RATE_LIMITS']:
+                rate, burst = config['RATE_LIMITS'][endpoint_class]
+                retry_after = take_token((endpoint_class, _admission_user()), rate, burst, config['RATE_LIMIT_MAX_USERS'])
+                if retry_after:
+                    response = jsonify({'error': 'Too many requests, slow down'})
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response, HTTPStatus.TOO_MANY_REQUESTS
+
+            if not heavy:
+                return f(*args, **kwargs)
+
+            timeout = config['HEAVY_QUEUE_TIMEOUT']
+            if not acquire_slot(config['HEAVY_CONCURRENCY'], config['HEAVY_QUEUE_SIZE'], timeout):
+                response = jsonify({'error': 'Server is busy, try again later'})
+                response.headers['Retry-After'] = str(max(1, int(timeout)))
+                return response, HTTPStatus.SERVICE_UNAVAILABLE
+            try:
+                return f(*args, **kwargs)
+            finally:
+                release_slot()
+        return decorated_function
+    return decorator
\ No newline at end of file
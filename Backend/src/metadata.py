@@ -4,3 +4,10 @@ class SecretType(Enum):
     RSA = "RSA"
     AES = "AES"
     # Add more types as needed
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
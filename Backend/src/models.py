@@ -1,6 +1,7 @@
 from datetime import datetime, UTC
+from sqlalchemy import delete
 from extensions import db
-from metadata import SecretType
+from metadata import SecretType, JobStatus
 
 class Project(db.Model):
     """Table to store projects that organize secrets"""
@@ -84,6 +85,78 @@ def initialize_secret_types():
     
     db.session.commit()
 
+def _delete_secret_rows(rows):
+    """Delete a chunk of secret rows with set-based statements"""
+    from core.search import remove_from_index
+    from core.changes import record_deleted
+    from core.stats import decrement_secret_stats
+
+    secret_ids = [row.id for row in rows]
+    rsa_ids = [row.rsa_content_id for row in rows if row.rsa_content_id]
+    aes_ids = [row.aes_content_id for row in rows if row.aes_content_id]
+
+    options = {'synchronize_session': False}
+    db.session.execute(delete(Secret).where(Secret.id.in_(secret_ids)), execution_options=options)
+    if rsa_ids:
+        db.session.execute(delete(RSASecretContent).where(RSASecretContent.id.in_(rsa_ids)), execution_options=options)
+    if aes_ids:
+        db.session.execute(delete(AESSecretContent).where(AESSecretContent.id.in_(aes_ids)), execution_options=options)
+    remove_from_index('secret', secret_ids)
+    record_deleted('secret', secret_ids)
+    record_deleted('rsa_key', rsa_ids)
+    decrement_secret_stats(rows)
+
+def delete_secrets(secret_ids, chunk_size=500):
+    """Delete secrets and their key content, committing after every chunk.
+
+    Returns the ids that were actually deleted.
+    """
+    deleted = []
+    for start in range(0, len(secret_ids), chunk_size):
+        rows = db.session.query(
+            Secret.id, Secret.rsa_content_id, Secret.aes_content_id,
+            Secret.project_id, Secret.secret_type_id, Secret.created_by
+        ).filter(Secret.id.in_(secret_ids[start:start + chunk_size])).all()
+        if not rows:
+            continue
+
+        _delete_secret_rows(rows)
+        db.session.commit()
+        deleted.extend(row.id for row in rows)
+    return deleted
+
+def delete_projects(project_ids, chunk_size=500):
+    """Delete projects with all of their secrets and key content.
+
+    Secrets go first, chunk by chunk, so the write lock is released between
+    chunks instead of being held for the whole project. Returns the number
+    of secrets deleted.
+    """
+    from core.search import remove_from_index
+    from core.changes import record_deleted
+
+    deleted = 0
+    for start in range(0, len(project_ids), chunk_size):
+        chunk = project_ids[start:start + chunk_size]
+        while True:
+            rows = db.session.query(
+                Secret.id, Secret.rsa_content_id, Secret.aes_content_id,
+                Secret.project_id, Secret.secret_type_id, Secret.created_by
+            ).filter(Secret.project_id.in_(chunk)).limit(chunk_size).all()
+            if not rows:
+                break
+
+            _delete_secret_rows(rows)
+            db.session.commit()
+            deleted += len(rows)
+
+        existing_ids = [project_id for (project_id,) in db.session.query(Project.id).filter(Project.id.in_(chunk))]
+        db.session.execute(delete(Project).where(Project.id.in_(existing_ids)), execution_options={'synchronize_session': False})
+        remove_from_index('project', existing_ids)
+        record_deleted('project', existing_ids)
+        db.session.commit()
+    return deleted
+
 class UserOperation(db.Model):
     """Table to store user operations"""
     __tablename__ = 'user_operations'
@@ -96,3 +169,74 @@ class UserOperation(db.Model):
     
     def __repr__(self):
         return f'<UserOperation id={self.id} operation={self.operation}>'
+
+
+class Job(db.Model):
+    """Table to store background jobs and their progress"""
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=JobStatus.PENDING.value, index=True)
+    params = db.Column(db.Text)  # JSON encoded handler parameters
+    created_by = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed on every progress report
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    cursor = db.Column(db.Integer)  # last processed row id, used to resume
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    result = db.Column(db.Text)  # JSON encoded handler result
+    error = db.Column(db.Text)
+    
+    def __repr__(self):
+        return f'<Job id={self.id} type={self.job_type} status={self.status}>'
+
+
+class IdempotencyKey(db.Model):
+    """Table to store responses of requests sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_keys'
+    
+    scope = db.Column(db.String(50), primary_key=True)  # endpoint the key belongs to
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # hash of the request payload
+    status_code = db.Column(db.Integer)  # NULL while the first request is still in flight
+    response_body = db.Column(db.Text)
+    mimetype = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey scope={self.scope} key={self.key}>'
+
+
+class Change(db.Model):
+    """Table to store the change feed, one row per mutation"""
+    __tablename__ = 'changes'
+    # AUTOINCREMENT keeps seq strictly increasing even after old rows are pruned
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # created, updated or deleted
+    data = db.Column(db.Text)  # JSON encoded entity, NULL for deletions
+    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(UTC), index=True)
+    
+    def __repr__(self):
+        return f'<Change seq={self.seq} {self.entity_type}:{self.entity_id} {self.action}>'
+
+
+class InventoryStat(db.Model):
+    """Table to store secret counters, maintained alongside every secret insert and delete"""
+    __tablename__ = 'inventory_stats'
+    
+    dimension = db.Column(db.String(20), primary_key=True)  # total, project, type or creator
+    key = db.Column(db.String(100), primary_key=True)  # project id, secret type id or username
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<InventoryStat {self.dimension}:{self.key}={self.count}>'
@@ -0,0 +1,171 @@
+import json
+import os
+import time
+import zipfile
+from datetime import datetime, UTC
+
+from core.jobs import job_handler, report_progress, get_result_dir
+from core.serialization import serialize_operation
+from metadata import SecretType
+from models import Project, Secret, RSASecretContent, SecretTypeModel, UserOperation, db
+
+ARCHIVE_BATCH_SIZE = 50
+EXPORT_BATCH_SIZE = 500
+
+
+def _get_project(params: dict) -> Project:
+    project = db.session.get(Project, params.get('project_id'))
+    if not project: raise ValueError(f"Project {params.get('project_id')} not found")
+    return project
+
+
+def _result_path(job, extension: str) -> tuple[str, str]:
+    file_name = f'job_{job.id}_{job.job_type}.{extension}'
+    return file_name, os.path.join(get_result_dir(), file_name)
+
+
+@job_handler('generate_keys')
+def generate_keys(job, params):
+    """Generate `count` RSA secrets in a project, one checkpoint per key"""
+    from core.keygen import generate_rsa_key_pair
+
+    project = _get_project(params)
+    count = int(params.get('count', 0))
+    key_size = int(params.get('key_size', 2048))
+    if count <= 0: raise ValueError('count must be a positive integer')
+
+    rsa_type = SecretTypeModel.query.filter_by(name=SecretType.RSA.value).first()
+    created_by = params.get('created_by') or job.created_by
+    description = params.get('description') or f'Generated by job {job.id}'
+
+    # progress is committed together with each key, so it is the resume point
+    for index in range(job.progress, count):
+        private_pem, public_pem = generate_rsa_key_pair(key_size)
+        rsa_content = RSASecretContent(private_key=private_pem, public_key=public_pem, key_size=key_size)
+        db.session.add(rsa_content)
+        db.session.flush()
+        db.session.add(Secret(
+            description=description,
+            created_by=created_by,
+            created_at=datetime.now(UTC),
+            project_id=project.id,
+            secret_type_id=rsa_type.id,
+            rsa_content_id=rsa_content.id
+        ))
+        report_progress(job, index + 1, total=count)
+
+    return {'project_id': project.id, 'generated': count}
+
+
+@job_handler('rotate_keys')
+def rotate_keys(job, params):
+    """Replace the RSA key pair of every secret in a project"""
+    from core.keygen import generate_rsa_key_pair
+
+    project = _get_project(params)
+    query = Secret.query.filter(
+        Secret.project_id == project.id,
+        Secret.rsa_content_id.isnot(None)
+    )
+    if job.total is None: report_progress(job, 0, total=query.count())
+
+    last_id = job.cursor or 0
+    while True:
+        secret = query.filter(Secret.id > last_id).order_by(Secret.id).first()
+        if not secret: break
+
+        rsa_content = secret.rsa_content
+        rsa_content.private_key, rsa_content.public_key = generate_rsa_key_pair(rsa_content.key_size or 2048)
+        last_id = secret.id
+        report_progress(job, job.progress + 1, cursor=last_id)
+
+    return {'project_id': project.id, 'rotated': job.progress}
+
+
+@job_handler('archive_project')
+def archive_project(job, params):
+    """Write every key pair of a project into a single ZIP file"""
+    project = _get_project(params)
+    query = Secret.query.filter(
+        Secret.project_id == project.id,
+        Secret.rsa_content_id.isnot(None)
+    )
+    # The archive is rebuilt from scratch when a job is resumed
+    report_progress(job, 0, total=query.count())
+
+    file_name, path = _result_path(job, 'zip')
+    temp_path = f'{path}.part'
+    archived = 0
+    last_id = 0
+    with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        while True:
+            secrets = query.filter(Secret.id > last_id).order_by(Secret.id).limit(ARCHIVE_BATCH_SIZE).all()
+            if not secrets: break
+
+            for secret in secrets:
+                zf.writestr(f'secret_{secret.id}/public_key.pem', secret.rsa_content.public_key)
+                zf.writestr(f'secret_{secret.id}/private_key.pem', secret.rsa_content.private_key)
+                zf.writestr(f'secret_{secret.id}/metadata.txt', f"""Secret ID: {secret.id}
+Description: {secret.description}
+Created By: {secret.created_by}
+Created At: {secret.created_at}
+Key Size: {secret.rsa_content.key_size} bits
+""")
+            archived += len(secrets)
+            last_id = secrets[-1].id
+            report_progress(job, archived)
+
+    os.replace(temp_path, path)
+    return {'project_id': project.id, 'secrets': archived, 'file': file_name}
+
+
+@job_handler('export_operations')
+def export_operations(job, params):
+    """Export the audit log as newline-delimited JSON"""
+    query = UserOperation.query
+    if params.get('username'): query = query.filter_by(username=params['username'])
+    report_progress(job, 0, total=query.count())
+
+    file_name, path = _result_path(job, 'ndjson')
+    temp_path = f'{path}.part'
+    exported = 0
+    last_id = 0
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        while True:
+            operations = query.filter(UserOperation.id > last_id).order_by(UserOperation.id).limit(EXPORT_BATCH_SIZE).all()
+            if not operations: break
+
+            for op in operations:
+                f.write(json.dumps(serialize_operation(op)) + '\n')
+            exported += len(operations)
+            last_id = operations[-1].id
+            report_progress(job, exported)
+
+    os.replace(temp_path, path)
+    return {'operations': exported, 'file': file_name}
+
+
+@job_handler('backup_database')
+def backup_database(job, params):
+    """Write an online snapshot of the database, reporting copied pages"""
+    from flask import current_app
+    from core.backup import create_snapshot, get_backup_dir, get_database_path
+
+    config = current_app.config
+    last_report = [0.0]
+
+    def report(copied, total):
+        # Checkpoint at most once a second, the copy itself is far faster
+        if time.monotonic() - last_report[0] >= 1 or copied == total:
+            last_report[0] = time.monotonic()
+            report_progress(job, copied, total=total)
+
+    return create_snapshot(
+        get_database_path(),
+        get_backup_dir(),
+        pages_per_step=config['BACKUP_PAGES_PER_STEP'],
+        step_sleep=config['BACKUP_STEP_SLEEP'],
+        compress_level=config['BACKUP_COMPRESS_LEVEL'],
+        keep=config['BACKUP_KEEP'],
+        progress=report
+    )
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import TestingConfig  # noqa: E402
+from core.factory import create_app  # noqa: E402
+from models import Secret, db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        BACKUP_DIR = str(tmp_path / 'backups')
+        JOB_RESULT_DIR = str(tmp_path / 'jobs')
+        RATE_LIMITS = {}
+
+    # Key generation runs in a process pool, a fixed pair keeps the tests fast
+    monkeypatch.setattr('core.keygen.generate_rsa_key_pair_in_pool', lambda *args, **kwargs: ('private', 'public'))
+    app = create_app(Config)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def project_id(client):
+    return client.post('/api/projects', json={'project_name': 'idempotency'}).get_json()['id']
+
+
+@pytest.fixture
+def count_secrets(app):
+    def count():
+        with app.app_context():
+            return db.session.query(Secret).count()
+    return count
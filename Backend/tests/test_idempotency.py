@@ -0,0 +1,116 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+
+def secret_payload(project_id, description='deploy key'):
+    return {'description': description, 'created_by': 'tester', 'project_id': project_id, 'secret_type_id': 1}
+
+
+def post_secret(client, key, payload):
+    return client.post('/api/secrets', json=payload, headers={'Idempotency-Key': key})
+
+
+def test_replay_returns_stored_response(client, project_id, count_secrets):
+    key = str(uuid.uuid4())
+    first = post_secret(client, key, secret_payload(project_id))
+    second = post_secret(client, key, secret_payload(project_id))
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json() == first.get_json()
+    assert count_secrets() == 1
+
+
+def test_different_payload_is_rejected(client, project_id, count_secrets):
+    key = str(uuid.uuid4())
+    assert post_secret(client, key, secret_payload(project_id)).status_code == 201
+
+    response = post_secret(client, key, secret_payload(project_id, 'another key'))
+    assert response.status_code == 422
+    assert count_secrets() == 1
+
+
+def test_server_error_is_not_stored(client, project_id, count_secrets, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('key generation failed')
+
+    key = str(uuid.uuid4())
+    with monkeypatch.context() as patch:
+        patch.setattr('core.keygen.generate_rsa_key_pair_in_pool', fail)
+        with pytest.raises(RuntimeError):
+            post_secret(client, key, secret_payload(project_id))
+    assert count_secrets() == 0
+
+    retried = post_secret(client, key, secret_payload(project_id))
+    assert retried.status_code == 201
+    assert 'Idempotent-Replayed' not in retried.headers
+    assert count_secrets() == 1
+
+
+def test_busy_response_is_not_stored(app, client, project_id, count_secrets):
+    key = str(uuid.uuid4())
+    app.config.update(HEAVY_CONCURRENCY=0, HEAVY_QUEUE_SIZE=0)
+    assert post_secret(client, key, secret_payload(project_id)).status_code == 503
+
+    app.config.update(HEAVY_CONCURRENCY=2, HEAVY_QUEUE_SIZE=2)
+    retried = post_secret(client, key, secret_payload(project_id))
+    assert retried.status_code == 201
+    assert 'Idempotent-Replayed' not in retried.headers
+    assert count_secrets() == 1
+
+
+def test_rate_limited_response_is_not_stored(app, client, project_id, count_secrets):
+    key = str(uuid.uuid4())
+    app.config['RATE_LIMITS'] = {'keygen': (1, 0)}
+    assert post_secret(client, key, secret_payload(project_id)).status_code == 429
+
+    app.config['RATE_LIMITS'] = {}
+    retried = post_secret(client, key, secret_payload(project_id))
+    assert retried.status_code == 201
+    assert 'Idempotent-Replayed' not in retried.headers
+    assert count_secrets() == 1
+
+
+def slow_keygen(*args, **kwargs):
+    time.sleep(0.5)
+    return 'private', 'public'
+
+
+def post_concurrently(app, key, payload, count):
+    responses = []
+
+    def post():
+        responses.append(post_secret(app.test_client(), key, payload))
+
+    threads = [threading.Thread(target=post) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def test_concurrent_duplicates_wait_for_the_first_request(app, project_id, count_secrets, monkeypatch):
+    monkeypatch.setattr('core.keygen.generate_rsa_key_pair_in_pool', slow_keygen)
+    app.config['IDEMPOTENCY_MAX_WAITERS'] = 4
+
+    responses = post_concurrently(app, str(uuid.uuid4()), secret_payload(project_id), 4)
+
+    assert [response.status_code for response in responses] == [201] * 4
+    assert sum(response.headers.get('Idempotent-Replayed') == 'true' for response in responses) == 3
+    assert len({response.get_json()['id'] for response in responses}) == 1
+    assert count_secrets() == 1
+
+
+def test_duplicates_beyond_the_waiter_cap_are_rejected(app, project_id, count_secrets, monkeypatch):
+    monkeypatch.setattr('core.keygen.generate_rsa_key_pair_in_pool', slow_keygen)
+    app.config['IDEMPOTENCY_MAX_WAITERS'] = 1
+
+    responses = post_concurrently(app, str(uuid.uuid4()), secret_payload(project_id), 4)
+
+    assert sorted(response.status_code for response in responses) == [201, 201, 409, 409]
+    assert count_secrets() == 1